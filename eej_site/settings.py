@@ -85,6 +85,18 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache (pages publiques, suggestions de recherche). LocMemCache par défaut; pour partager
+# le cache entre processus, utiliser par ex. FileBasedCache avec LOCATION = BASE_DIR / 'cache'.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'eej-default',
+        'TIMEOUT': 300,
+    }
+}
+# Durée de vie (s) du contexte et des fragments mis en cache par website/viewcache.py
+VIEW_CACHE_TIMEOUT = 300
+
 # === Email ===
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from payments import webhooks
+
+
+class Command(BaseCommand):
+    help = "Worker d'application des webhooks FedaPay reçus (ordre d'arrivée). Tourne en boucle sauf --once."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Vider la file disponible puis quitter")
+        parser.add_argument('--sleep', type=float, default=2.0, help="Pause (s) quand la file est vide")
+        parser.add_argument('--batch-size', type=int, default=webhooks.DEFAULT_BATCH_SIZE, help="Événements par lot")
+
+    def handle(self, *args, **options):
+        requeued = webhooks.requeue_stale()
+        if requeued:
+            self.stdout.write(f"{requeued} événements abandonnés remis en file.")
+        try:
+            while True:
+                processed = webhooks.process_batch(options['batch_size'])
+                if processed:
+                    self.stdout.write(f"{processed} événements traités.")
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            self.stdout.write("Arrêt du worker.")
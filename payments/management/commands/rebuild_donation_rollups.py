@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from payments import rollups
+
+
+class Command(BaseCommand):
+    help = "Recalcule les agrégats journaliers des dons (DonationDailyRollup) depuis la table des dons."
+
+    def handle(self, *args, **options):
+        count = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{count} lignes d'agrégat écrites."))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from payments import webhooks
+from payments.models import WebhookEvent
+
+
+class Command(BaseCommand):
+    help = "Remet en file des webhooks FedaPay enregistrés (reprise après incident), puis les applique avec --process."
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int, help="Identifiants des événements à rejouer")
+        parser.add_argument('--status', action='append', choices=['processed', 'ignored', 'failed'],
+                            help="Rejouer les événements de ce statut (option répétable)")
+        parser.add_argument('--reference', help="Rejouer les événements d'un don (référence EEJ)")
+        parser.add_argument('--since', type=float, help="Limiter aux événements reçus depuis N heures")
+        parser.add_argument('--process', action='store_true', help="Appliquer aussitôt les événements remis en file")
+
+    def handle(self, *args, **options):
+        if not (options['ids'] or options['status'] or options['reference']):
+            raise CommandError("Préciser des identifiants, --status ou --reference.")
+        qs = WebhookEvent.objects.all()
+        if options['ids']:
+            qs = qs.filter(id__in=options['ids'])
+        if options['status']:
+            qs = qs.filter(status__in=options['status'])
+        if options['reference']:
+            qs = qs.filter(reference=options['reference'])
+        if options['since']:
+            qs = qs.filter(received_at__gte=timezone.now() - timezone.timedelta(hours=options['since']))
+        count = webhooks.replay(qs)
+        self.stdout.write(f"{count} événements remis en file.")
+        if options['process']:
+            total = 0
+            while True:
+                processed = webhooks.process_batch()
+                if not processed:
+                    break
+                total += processed
+            self.stdout.write(f"{total} événements traités.")
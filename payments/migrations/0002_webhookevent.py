@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(default='fedapay', max_length=20)),
+                ('dedupe_key', models.CharField(max_length=100, unique=True)),
+                ('event_id', models.CharField(blank=True, max_length=64)),
+                ('event_type', models.CharField(blank=True, max_length=64)),
+                ('payload', models.TextField()),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('processing', 'En cours'), ('processed', 'Traité'), ('ignored', 'Ignoré'), ('failed', 'Échec')], default='pending', max_length=12)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('max_attempts', models.PositiveSmallIntegerField(default=5)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('reference', models.CharField(blank=True, db_index=True, max_length=64)),
+                ('result', models.CharField(blank=True, max_length=255)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ('id',),
+                'indexes': [models.Index(fields=['status', 'run_after'], name='payments_we_status_37e5b1_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:03
+
+from django.db import migrations, models
+
+
+def fill_rollups(apps, schema_editor):
+    from payments.rollups import compute
+    Donation = apps.get_model('payments', 'Donation')
+    DonationDailyRollup = apps.get_model('payments', 'DonationDailyRollup')
+    DonationDailyRollup.objects.bulk_create((DonationDailyRollup(**row) for row in compute(Donation)), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_donation_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DonationDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('currency', models.CharField(max_length=8)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('paid', 'Paid'), ('failed', 'Failed'), ('canceled', 'Canceled')], max_length=12)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('amount', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('day', 'currency', 'status'),
+                'constraints': [models.UniqueConstraint(fields=('day', 'currency', 'status'), name='donation_rollup_unique_day')],
+            },
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 class Donation(models.Model):
     STATUS_CHOICES = [
@@ -17,5 +18,71 @@ class Donation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Liste des dons du tableau de bord: filtre par statut + pagination par curseur
+            models.Index(fields=["status", "created_at"]),
+            models.Index(fields=["created_at", "id"]),
+        ]
+
     def __str__(self):
         return f"Donation {self.reference} - {self.amount} {self.currency} - {self.status}"
+
+
+class WebhookEvent(models.Model):
+    """Notification FedaPay reçue, appliquée hors requête par `manage.py process_webhooks`.
+
+    `dedupe_key` (identifiant d'événement du fournisseur, sinon empreinte du corps) rend
+    les renvois de FedaPay idempotents: un même événement n'est enregistré qu'une fois.
+    """
+    STATUS_CHOICES = [
+        ("pending", "En attente"),
+        ("processing", "En cours"),
+        ("processed", "Traité"),
+        ("ignored", "Ignoré"),
+        ("failed", "Échec"),
+    ]
+    provider = models.CharField(max_length=20, default="fedapay")
+    dedupe_key = models.CharField(max_length=100, unique=True)
+    event_id = models.CharField(max_length=64, blank=True)
+    event_type = models.CharField(max_length=64, blank=True)
+    payload = models.TextField()
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    reference = models.CharField(max_length=64, blank=True, db_index=True)
+    result = models.CharField(max_length=255, blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ("id",)
+        indexes = [models.Index(fields=["status", "run_after"])]
+
+    def __str__(self):
+        return f"Webhook {self.provider} {self.event_type or self.dedupe_key} - {self.status}"
+
+
+class DonationDailyRollup(models.Model):
+    """Totaux des dons par jour (date du don), devise et statut final.
+
+    Tenu à jour par le worker des webhooks à chaque changement de statut (voir
+    payments/rollups.py); `manage.py rebuild_donation_rollups` le recalcule entièrement.
+    Les dons encore en attente n'y figurent pas.
+    """
+    day = models.DateField()
+    currency = models.CharField(max_length=8)
+    status = models.CharField(max_length=12, choices=Donation.STATUS_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+    amount = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        ordering = ("day", "currency", "status")
+        constraints = [
+            models.UniqueConstraint(fields=["day", "currency", "status"], name="donation_rollup_unique_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.currency} {self.status}: {self.count} / {self.amount}"
@@ -0,0 +1,199 @@
+import hashlib
+import hmac
+import json
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from payments import views, webhooks
+from payments.models import Donation, DonationDailyRollup, WebhookEvent
+
+
+def fedapay_event(event_id, name, reference, status, tx_id=4242):
+    """Événement au format des notifications FedaPay (enveloppe + transaction dans `entity`)."""
+    return {
+        'id': event_id,
+        'name': name,
+        'object': 'event',
+        'entity': {
+            'id': tx_id,
+            'klass': 'v1/transaction',
+            'reference': 'trx_%s' % tx_id,
+            'status': status,
+            'amount': 5000,
+            'custom_metadata': {'eej_ref': reference},
+        },
+    }
+
+
+class WebhookTests(TestCase):
+    """Les notifications sont signées localement (repli HMAC-SHA256, sans SDK FedaPay)."""
+
+    def setUp(self):
+        patcher = mock.patch.object(views, 'FEDAPAY_WEBHOOK_DISABLE_VERIFY', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.donation = Donation.objects.create(reference='eejref01', amount=5000)
+
+    def post(self, data, signature=None):
+        body = json.dumps(data)
+        if signature is None:
+            signature = hmac.new(views.FEDAPAY_WEBHOOK_SECRET.encode(), body.encode(), hashlib.sha256).hexdigest()
+        return Client().post(reverse('payments:webhook'), body, content_type='application/json',
+                             HTTP_FEDAPAY_SIGNATURE=signature)
+
+    def process(self):
+        call_command('process_webhooks', '--once', stdout=StringIO())
+        self.donation.refresh_from_db()
+
+    def test_acknowledged_without_touching_donation(self):
+        with self.assertNumQueries(3):  # SAVEPOINT, INSERT, RELEASE
+            resp = self.post(fedapay_event(901, 'transaction.approved', 'eejref01', 'approved'))
+        self.assertEqual(resp.status_code, 200)
+        self.donation.refresh_from_db()
+        self.assertEqual(self.donation.status, 'pending')
+        self.process()
+        self.assertEqual(self.donation.status, 'paid')
+        self.assertEqual(self.donation.fedapay_transaction_id, '4242')
+        self.assertEqual(WebhookEvent.objects.get().status, 'processed')
+
+    def test_bad_signature_rejected(self):
+        resp = self.post(fedapay_event(901, 'transaction.approved', 'eejref01', 'approved'), signature='faux')
+        self.assertEqual(resp.status_code, 400)
+        self.assertFalse(WebhookEvent.objects.exists())
+
+    def test_retries_deduplicated(self):
+        event = fedapay_event(901, 'transaction.approved', 'eejref01', 'approved')
+        self.post(event)
+        self.process()
+        self.assertEqual(self.post(event).status_code, 200)
+        # Sans id d'événement: dédoublonnage sur l'empreinte du corps
+        flat = {'id': 4242, 'status': 'approved', 'metadata': {'eej_ref': 'eejref01'}}
+        self.post(flat)
+        self.post(flat)
+        self.assertEqual(WebhookEvent.objects.count(), 2)
+
+    def test_transitions_applied_in_order(self):
+        self.post(fedapay_event(901, 'transaction.created', 'eejref01', 'pending'))
+        self.post(fedapay_event(902, 'transaction.approved', 'eejref01', 'approved'))
+        self.post(fedapay_event(903, 'transaction.canceled', 'eejref01', 'canceled'))
+        self.process()
+        self.assertEqual(self.donation.status, 'paid')
+        results = list(WebhookEvent.objects.values_list('event_id', 'status'))
+        self.assertEqual(results, [('901', 'ignored'), ('902', 'processed'), ('903', 'ignored')])
+
+    def test_replay_after_failure(self):
+        self.post(fedapay_event(901, 'transaction.approved', 'eejref01', 'approved'))
+        with mock.patch.object(webhooks, 'apply', side_effect=RuntimeError('base verrouillée')):
+            self.process()
+        event = WebhookEvent.objects.get()
+        self.assertEqual((event.status, event.attempts, event.result), ('pending', 1, 'base verrouillée'))
+        self.assertEqual(self.donation.status, 'pending')
+        out = StringIO()
+        call_command('replay_webhooks', str(event.pk), '--process', stdout=out)
+        self.donation.refresh_from_db()
+        self.assertEqual(self.donation.status, 'paid')
+        self.assertIn('1 événements traités', out.getvalue())
+
+    def test_unknown_donation_ignored(self):
+        self.post(fedapay_event(901, 'transaction.approved', 'inconnue', 'approved'))
+        self.process()
+        event = WebhookEvent.objects.get()
+        self.assertEqual((event.status, event.reference), ('ignored', 'inconnue'))
+
+
+class DonationsListTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(User.objects.create_user('staff', password='x', is_staff=True))
+        statuses = ['paid', 'paid', 'pending', 'failed', 'canceled']
+        for i in range(7):
+            Donation.objects.create(reference=f'ref{i}', amount=1000 * (i + 1), status=statuses[i % 5],
+                                    currency='EUR' if i == 6 else 'XOF')
+
+    def test_stats_in_one_query(self):
+        counts, amounts = views.donation_stats(Donation.objects.all())
+        self.assertEqual(counts, {'total': 7, 'paid': 4, 'pending': 1, 'failed': 1, 'canceled': 1})
+        self.assertEqual(amounts, [
+            {'currency': 'EUR', 'paid': 7000, 'pending': 0},
+            {'currency': 'XOF', 'paid': 1000 + 2000 + 6000, 'pending': 3000},
+        ])
+        with self.assertNumQueries(1):
+            views.donation_stats(Donation.objects.filter(currency='XOF'))
+
+    def test_keyset_pagination_and_filters(self):
+        url = reverse('payments:donations_list')
+        with mock.patch.object(views, 'DONATIONS_PER_PAGE', 3):
+            first = self.client.get(url)
+            refs = [d.reference for d in first.context['donations']]
+            self.assertEqual(refs, ['ref6', 'ref5', 'ref4'])
+            second = self.client.get(url + '?' + first.context['older_query'])
+            self.assertEqual([d.reference for d in second.context['donations']], ['ref3', 'ref2', 'ref1'])
+            third = self.client.get(url + '?' + second.context['older_query'])
+            self.assertEqual([d.reference for d in third.context['donations']], ['ref0'])
+            self.assertEqual(third.context['older_query'], '')
+            back = self.client.get(url + '?' + third.context['newer_query'])
+            self.assertEqual([d.reference for d in back.context['donations']], ['ref3', 'ref2', 'ref1'])
+        paid = self.client.get(url, {'status': 'paid'})
+        self.assertEqual([d.reference for d in paid.context['donations']], ['ref6', 'ref5', 'ref1', 'ref0'])
+        self.assertEqual(paid.context['counts']['total'], 7)
+        empty = self.client.get(url, {'du': '2000-01-01', 'au': '2000-01-31'})
+        self.assertEqual(list(empty.context['donations']), [])
+
+
+class DonationRollupTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(views, 'FEDAPAY_WEBHOOK_DISABLE_VERIFY', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.first = Donation.objects.create(reference='r1', amount=5000)
+        self.second = Donation.objects.create(reference='r2', amount=2000)
+
+    def send(self, event_id, reference, status):
+        body = json.dumps(fedapay_event(event_id, 'transaction.' + status, reference, status))
+        Client().post(reverse('payments:webhook'), body, content_type='application/json')
+        call_command('process_webhooks', '--once', stdout=StringIO())
+
+    def rows(self):
+        return list(DonationDailyRollup.objects.filter(count__gt=0).values_list('status', 'count', 'amount'))
+
+    def test_updated_by_webhook_transitions(self):
+        self.send(1, 'r1', 'declined')
+        self.send(2, 'r2', 'approved')
+        self.assertEqual(self.rows(), [('failed', 1, 5000), ('paid', 1, 2000)])
+        # Nouvel essai réussi: le don passe d'échec à payé
+        self.send(3, 'r1', 'approved')
+        self.assertEqual(self.rows(), [('paid', 2, 7000)])
+
+    def test_missing_row_recomputed_on_decrement(self):
+        self.send(1, 'r1', 'declined')
+        self.send(2, 'r2', 'declined')
+        DonationDailyRollup.objects.all().delete()
+        with self.assertLogs('payments.rollups', 'WARNING'):
+            self.send(3, 'r1', 'approved')
+        self.assertEqual(self.rows(), [('failed', 1, 2000), ('paid', 1, 5000)])
+
+    def test_rebuild_matches_incremental(self):
+        self.send(1, 'r1', 'approved')
+        self.send(2, 'r2', 'canceled')
+        incremental = self.rows()
+        DonationDailyRollup.objects.all().delete()
+        call_command('rebuild_donation_rollups', stdout=StringIO())
+        self.assertEqual(self.rows(), incremental)
+
+    def test_staff_json_endpoint(self):
+        self.send(1, 'r1', 'approved')
+        url = reverse('payments:donation_rollups')
+        self.assertEqual(Client().get(url).status_code, 302)
+        client = Client()
+        client.force_login(User.objects.create_user('staff', password='x', is_staff=True))
+        with self.assertNumQueries(3):  # session, utilisateur, agrégats
+            data = client.get(url).json()
+        today = timezone.localdate().isoformat()
+        self.assertEqual(data['rows'], [{'date': today, 'currency': 'XOF', 'status': 'paid', 'count': 1, 'amount': 5000}])
+        self.assertEqual(data['totals'], {'XOF': {'count': 1, 'amount': 5000}})
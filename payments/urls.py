@@ -9,5 +9,6 @@ urlpatterns = [
     path('paiement/annule/', views.cancel, name='cancel'),
     path('webhooks/fedapay/', views.webhook, name='webhook'),
     path('dashboard/donations/', views.donations_list, name='donations_list'),
+    path('dashboard/donations/journalier.json', views.donation_rollups, name='donation_rollups'),
     path('dashboard/fedapay-debug/', views.fedapay_debug, name='fedapay_debug'),
 ]
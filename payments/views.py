@@ -6,9 +6,15 @@ from django.shortcuts import render, redirect
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.encoding import force_bytes
 import hmac, hashlib
+from datetime import date, datetime, time, timedelta
+from urllib.parse import urlencode
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Count, Q, Sum
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from . import rollups, webhooks
 from .models import Donation
 
 # NOTE: Remplacer par SDK FedaPay réel si disponible dans l'environnement.
@@ -104,83 +110,135 @@ def webhook(request):
             return HttpResponseBadRequest('Signature invalide')
     try:
         data = json.loads(payload or '{}')
-    except Exception:
+    except ValueError:
         return HttpResponseBadRequest('Payload invalide')
+    # Accusé de réception immédiat: le don est mis à jour par `manage.py process_webhooks`
+    webhooks.record(payload, data)
+    return HttpResponse('ok')
 
-    # Extraction robuste des champs utiles (référence, statut, id) selon différentes structures possibles
-    def deep_find(obj, keys):
-        # Retourne la première valeur trouvée pour l'une des clés dans un dict/list imbriqué
-        if isinstance(obj, dict):
-            for k in keys:
-                if k in obj and obj[k] is not None:
-                    return obj[k]
-            for v in obj.values():
-                res = deep_find(v, keys)
-                if res is not None:
-                    return res
-        elif isinstance(obj, list):
-            for it in obj:
-                res = deep_find(it, keys)
-                if res is not None:
-                    return res
-        return None
 
-    # Certains envois ont data.object, d'autres peuvent être à plat ou sous "transaction"
-    tx = data.get('data', {}).get('object') or data.get('transaction') or data
-    # Référence: priorité à notre eej_ref dans custom_metadata/metadata, sinon reference générique
-    reference = deep_find(tx, ['eej_ref'])
-    if not reference:
-        reference = deep_find(tx, ['reference'])
-    status = deep_find(tx, ['status'])
-    fedapay_id_val = deep_find(tx, ['id'])
-    fedapay_id = str(fedapay_id_val or '')
-
-    # Log simple pour debug (console)
-    try:
-        print('[FedaPay webhook] ref=', reference, 'status=', status, 'id=', fedapay_id)
-    except Exception:
-        pass
+DONATIONS_PER_PAGE = 50
+DONATION_STATUSES = [code for code, _ in Donation.STATUS_CHOICES]
 
-    if not reference:
-        # En mode debug (disable verify), on ne bloque pas pour faciliter le diagnostic
-        if FEDAPAY_WEBHOOK_DISABLE_VERIFY:
-            return HttpResponse('ok')
-        return HttpResponseBadRequest('Référence manquante')
 
+def _parse_day(value):
     try:
-        donation = Donation.objects.get(reference=reference)
-    except Donation.DoesNotExist:
-        if FEDAPAY_WEBHOOK_DISABLE_VERIFY:
-            return HttpResponse('ok')
-        return HttpResponseBadRequest('Donation inconnue')
-
-    # Mapper les statuts FedaPay aux nôtres
-    mapping = {
-        'approved': 'paid',
-        'paid': 'paid',
-        'canceled': 'canceled',
-        'failed': 'failed',
-    }
-    new_status = mapping.get(status)
-    if new_status:
-        donation.status = new_status
-        donation.fedapay_transaction_id = fedapay_id
-        donation.save(update_fields=['status', 'fedapay_transaction_id', 'updated_at'])
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
 
-    return HttpResponse('ok')
+
+def _parse_cursor(value):
+    """Curseur de pagination « <created_at isoformat>|<id> » → (datetime, id), ou None."""
+    if not value or '|' not in value:
+        return None
+    stamp, _, pk = value.rpartition('|')
+    created = parse_datetime(stamp)
+    if created is None or not pk.isdigit():
+        return None
+    return created, int(pk)
+
+
+def _cursor(donation):
+    return f"{donation.created_at.isoformat()}|{donation.pk}"
+
+
+def donation_stats(qs):
+    """Compteurs par statut et montants par devise, en une seule requête groupée par devise."""
+    rows = qs.order_by().values('currency').annotate(
+        total=Count('id'),
+        **{status: Count('id', filter=Q(status=status)) for status in DONATION_STATUSES},
+        paid_amount=Sum('amount', filter=Q(status='paid')),
+        pending_amount=Sum('amount', filter=Q(status='pending')),
+    ).order_by('currency')
+    counts = dict.fromkeys(['total'] + DONATION_STATUSES, 0)
+    amounts = []
+    for row in rows:
+        for key in counts:
+            counts[key] += row[key]
+        amounts.append({
+            'currency': row['currency'],
+            'paid': row['paid_amount'] or 0,
+            'pending': row['pending_amount'] or 0,
+        })
+    return counts, amounts
 
 
 @staff_member_required
 def donations_list(request):
-    qs = Donation.objects.order_by('-created_at')[:100]
-    counts = {
-        'total': Donation.objects.count(),
-        'paid': Donation.objects.filter(status='paid').count(),
-        'pending': Donation.objects.filter(status='pending').count(),
-        'failed': Donation.objects.filter(status='failed').count(),
-        'canceled': Donation.objects.filter(status='canceled').count(),
-    }
-    return render(request, 'payments/donations_list.html', { 'donations': qs, 'counts': counts })
+    """Historique complet des dons, filtrable (statut, période), paginé par curseur
+    (created_at, id): chaque page est une lecture d'index, quelle que soit sa profondeur."""
+    status = request.GET.get('status', '')
+    if status not in DONATION_STATUSES:
+        status = ''
+    day_from = _parse_day(request.GET.get('du'))
+    day_to = _parse_day(request.GET.get('au'))
+
+    qs = Donation.objects.all()
+    # Bornes en datetime (et non created_at__date) pour rester sur l'index
+    if day_from:
+        qs = qs.filter(created_at__gte=timezone.make_aware(datetime.combine(day_from, time.min)))
+    if day_to:
+        qs = qs.filter(created_at__lt=timezone.make_aware(datetime.combine(day_to + timedelta(days=1), time.min)))
+    # Les indicateurs portent sur la période, tous statuts confondus
+    counts, amounts = donation_stats(qs)
+    if status:
+        qs = qs.filter(status=status)
+
+    after = _parse_cursor(request.GET.get('apres'))
+    before = None if after else _parse_cursor(request.GET.get('avant'))
+    if after:
+        created, pk = after
+        qs = qs.filter(Q(created_at__lt=created) | Q(created_at=created, id__lt=pk)).order_by('-created_at', '-id')
+    elif before:
+        created, pk = before
+        qs = qs.filter(Q(created_at__gt=created) | Q(created_at=created, id__gt=pk)).order_by('created_at', 'id')
+    else:
+        qs = qs.order_by('-created_at', '-id')
+    # Une ligne de plus pour savoir s'il existe une page suivante dans ce sens
+    rows = list(qs[:DONATIONS_PER_PAGE + 1])
+    more = len(rows) > DONATIONS_PER_PAGE
+    rows = rows[:DONATIONS_PER_PAGE]
+    if before:
+        rows.reverse()
+    has_older = more if not before else True
+    has_newer = bool(after) or (bool(before) and more)
+
+    filters = {k: v for k, v in (('status', status), ('du', request.GET.get('du', '')), ('au', request.GET.get('au', ''))) if v}
+    older_query = urlencode({**filters, 'apres': _cursor(rows[-1])}) if rows and has_older else ''
+    newer_query = urlencode({**filters, 'avant': _cursor(rows[0])}) if rows and has_newer else ''
+    return render(request, 'payments/donations_list.html', {
+        'donations': rows,
+        'counts': counts,
+        'amounts': amounts,
+        'status': status,
+        'statuses': Donation.STATUS_CHOICES,
+        'day_from': request.GET.get('du', '') if day_from else '',
+        'day_to': request.GET.get('au', '') if day_to else '',
+        'older_query': older_query,
+        'newer_query': newer_query,
+        'first_query': urlencode(filters) if (after or before) else None,
+    })
+
+
+@staff_member_required
+def donation_rollups(request):
+    """Séries journalières pré-agrégées (DonationDailyRollup) pour les graphiques du tableau de bord."""
+    status = request.GET.get('status', 'paid')
+    if status not in rollups.ROLLUP_STATUSES:
+        status = 'paid'
+    rows = rollups.series(
+        day_from=_parse_day(request.GET.get('du')),
+        day_to=_parse_day(request.GET.get('au')),
+        status=status,
+        currency=request.GET.get('currency') or None,
+    )
+    totals = {}
+    for row in rows:
+        total = totals.setdefault(row['currency'], {'count': 0, 'amount': 0})
+        total['count'] += row['count']
+        total['amount'] += row['amount']
+    return JsonResponse({'status': status, 'rows': rows, 'totals': totals})
 
 
 @staff_member_required
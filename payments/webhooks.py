@@ -0,0 +1,192 @@
+"""File des webhooks FedaPay.
+
+La vue `webhook` vérifie la signature, enregistre l'événement (WebhookEvent) et répond
+aussitôt: aucun accès aux dons pendant la requête. Un renvoi du même événement (même id
+FedaPay, ou à défaut même corps) est reconnu par `dedupe_key` et n'est pas rejoué.
+
+Le worker `manage.py process_webhooks` applique les événements dans leur ordre d'arrivée,
+sous verrou de ligne sur le don concerné; un statut final (payé) n'est jamais écrasé
+par un événement arrivé en retard. `manage.py replay_webhooks` remet des événements en file.
+"""
+import hashlib
+import json
+import logging
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import rollups
+from .models import Donation, WebhookEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+RETRY_BASE_SECONDS = 30
+STALE_AFTER = timezone.timedelta(minutes=15)
+
+# Statut FedaPay → statut du don
+STATUS_MAP = {
+    'approved': 'paid',
+    'paid': 'paid',
+    'transferred': 'paid',
+    'canceled': 'canceled',
+    'declined': 'failed',
+    'failed': 'failed',
+}
+# Transitions autorisées (un don payé ne change plus)
+TRANSITIONS = {
+    'pending': {'paid', 'failed', 'canceled'},
+    'failed': {'paid', 'canceled'},
+    'canceled': {'paid'},
+    'paid': set(),
+}
+
+
+def dedupe_key(data, payload):
+    """Identifiant de l'événement FedaPay s'il est fourni, sinon sha256 du corps reçu.
+
+    Un `id` à la racine d'un envoi « à plat » est celui de la transaction, partagé par tous
+    ses changements de statut: il ne sert de clé que pour une enveloppe d'événement.
+    """
+    is_event = isinstance(data, dict) and ('entity' in data or 'name' in data)
+    event_id = data.get('id') if is_event else None
+    if event_id not in (None, ''):
+        return f"id:{event_id}", str(event_id)
+    return "sha256:" + hashlib.sha256(payload.encode('utf-8')).hexdigest(), ''
+
+
+def record(payload, data, provider='fedapay'):
+    """Enregistre un événement reçu (`data`: le corps déjà décodé); retourne (événement, créé)."""
+    key, event_id = dedupe_key(data, payload)
+    event_type = (data.get('name') or data.get('type') or '') if isinstance(data, dict) else ''
+    try:
+        with transaction.atomic():
+            event = WebhookEvent.objects.create(
+                provider=provider,
+                dedupe_key=key,
+                event_id=event_id[:64],
+                event_type=str(event_type)[:64],
+                payload=payload,
+            )
+    except IntegrityError:
+        return WebhookEvent.objects.get(dedupe_key=key), False
+    return event, True
+
+
+def _transaction(data):
+    # Selon l'envoi: entity (événements FedaPay), data.object, transaction, ou à plat
+    if not isinstance(data, dict):
+        return {}
+    nested = data.get('data')
+    candidates = (data.get('entity'), nested.get('object') if isinstance(nested, dict) else None, data.get('transaction'))
+    for candidate in candidates:
+        if isinstance(candidate, dict):
+            return candidate
+    return data
+
+
+def _first_values(obj, keys):
+    """Première valeur de chacune des `keys` dans une structure imbriquée, en un seul parcours."""
+    found = {}
+    queue = [obj]
+    while queue and len(found) < len(keys):
+        current = queue.pop(0)
+        if isinstance(current, dict):
+            for k in keys:
+                if k not in found and current.get(k) is not None:
+                    found[k] = current[k]
+            queue.extend(v for v in current.values() if isinstance(v, (dict, list)))
+        elif isinstance(current, list):
+            queue.extend(v for v in current if isinstance(v, (dict, list)))
+    return found
+
+
+def extract(data):
+    """(référence EEJ, statut FedaPay, id de transaction) d'un événement."""
+    tx = _transaction(data)
+    meta = tx.get('custom_metadata') or tx.get('metadata') or {}
+    reference = meta.get('eej_ref') if isinstance(meta, dict) else None
+    status = tx.get('status')
+    tx_id = tx.get('id')
+    if not (reference and status and tx_id is not None):
+        found = _first_values(tx, ('eej_ref', 'reference', 'status', 'id'))
+        reference = reference or found.get('eej_ref') or found.get('reference')
+        status = status or found.get('status')
+        tx_id = tx_id if tx_id is not None else found.get('id')
+    return reference, status, str(tx_id or '')
+
+
+def apply(event):
+    """Applique un événement au don concerné; retourne (statut de l'événement, résultat)."""
+    try:
+        data = json.loads(event.payload or '{}')
+    except ValueError:
+        return 'ignored', "Payload invalide"
+    reference, status, tx_id = extract(data)
+    if not reference:
+        return 'ignored', "Référence manquante"
+    event.reference = str(reference)[:64]
+    with transaction.atomic():
+        donation = Donation.objects.select_for_update().filter(reference=event.reference).first()
+        if donation is None:
+            return 'ignored', f"Donation inconnue: {reference}"
+        new_status = STATUS_MAP.get(status)
+        if not new_status:
+            return 'ignored', f"Statut non géré: {status}"
+        if new_status == donation.status:
+            return 'processed', f"Déjà {new_status}"
+        if new_status not in TRANSITIONS.get(donation.status, set()):
+            return 'ignored', f"Transition refusée: {donation.status} → {new_status}"
+        previous = donation.status
+        donation.status = new_status
+        donation.fedapay_transaction_id = tx_id
+        donation.save(update_fields=['status', 'fedapay_transaction_id', 'updated_at'])
+        rollups.record_transition(donation, previous)
+    return 'processed', f"{previous} → {new_status}"
+
+
+def requeue_stale(now=None):
+    now = now or timezone.now()
+    return WebhookEvent.objects.filter(status='processing', updated_at__lt=now - STALE_AFTER).update(status='pending')
+
+
+def claim_batch(batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """Réserve les prochains événements (mise à jour conditionnelle, sûre entre workers)."""
+    now = now or timezone.now()
+    ids = list(
+        WebhookEvent.objects.filter(status='pending', run_after__lte=now)
+        .order_by('id').values_list('id', flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+    WebhookEvent.objects.filter(id__in=ids, status='pending').update(status='processing', updated_at=now)
+    return list(WebhookEvent.objects.filter(id__in=ids, status='processing', updated_at=now).order_by('id'))
+
+
+def process_batch(batch_size=DEFAULT_BATCH_SIZE):
+    """Traite un lot dans l'ordre d'arrivée; retourne le nombre d'événements traités."""
+    batch = claim_batch(batch_size)
+    for event in batch:
+        event.attempts += 1
+        try:
+            event.status, event.result = apply(event)
+        except Exception as exc:
+            event.result = (str(exc) or exc.__class__.__name__)[:255]
+            if event.attempts < event.max_attempts:
+                event.status = 'pending'
+                event.run_after = timezone.now() + timezone.timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (event.attempts - 1))
+            else:
+                event.status = 'failed'
+            logger.warning("Webhook %s en échec (tentative %s/%s): %s", event.pk, event.attempts, event.max_attempts, event.result)
+        else:
+            event.result = event.result[:255]
+            event.processed_at = timezone.now()
+        event.save(update_fields=['status', 'attempts', 'run_after', 'reference', 'result', 'processed_at', 'updated_at'])
+    return len(batch)
+
+
+def replay(queryset):
+    """Remet des événements en file (reprise après incident); retourne leur nombre."""
+    return queryset.exclude(status='processing').update(
+        status='pending', attempts=0, run_after=timezone.now(), processed_at=None, result='',
+    )
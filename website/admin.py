@@ -1,17 +1,15 @@
 from django.contrib import admin
 from django import forms
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 import csv
 from datetime import datetime
-from .models import NewsItem, Center, ContactMessage, Category, NewsMedia, ImpactMetrics, GalleryCollection, GalleryMedia
+from .models import NewsItem, Center, ContactMessage, Category, NewsMedia, ImpactMetrics, GalleryCollection, GalleryMedia, GalleryImport, BackgroundJob, OutboxEmail
+from django.db import transaction
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
-from django.conf import settings
+from .gallery_import import import_folder, import_zip
+from .zipstream import ZipEntry, archive_size, iter_zip
+from functools import partial
 from pathlib import Path
-import mimetypes
-import shutil
-import io
-import zipfile
 
 
 class NewsItemAdminForm(forms.ModelForm):
@@ -55,7 +53,7 @@ class RecentDateFilter(admin.SimpleListFilter):
 @admin.register(NewsItem)
 class NewsItemAdmin(admin.ModelAdmin):
     form = NewsItemAdminForm
-    list_display = ('title', 'type', 'status', 'created', 'event_range')
+    list_display = ('title', 'type', 'status', 'created', 'event_range', 'rendition_status')
     list_filter = ('type', 'status', 'created', 'event_start', 'event_end', 'category')
     search_fields = ('title', 'content', 'location')
     prepopulated_fields = {'slug': ('title',)}
@@ -68,9 +66,9 @@ class NewsItemAdmin(admin.ModelAdmin):
             'description': "Téléversez ici l'image de couverture. Pour plusieurs images ou des vidéos, utilisez le bloc \"Médias\" ci-dessous (ordre configurable)."
         }),
         ('Événement', {'fields': ('event_start', 'event_end', 'location')}),
-        ('Meta', {'fields': ('created', 'updated')}),
+        ('Meta', {'fields': ('created', 'updated', 'rendition_status')}),
     )
-    readonly_fields = ('created', 'updated')
+    readonly_fields = ('created', 'updated', 'rendition_status')
 
     class MediaInline(admin.TabularInline):
         model = NewsMedia
@@ -140,6 +138,43 @@ class ContactAdmin(admin.ModelAdmin):
     exporter_messages_csv.short_description = 'Exporter en CSV les messages sélectionnés'
 
 
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'progress', 'attempts', 'run_after', 'updated')
+    list_filter = ('status', 'kind')
+    readonly_fields = ('kind', 'payload', 'status', 'progress', 'attempts', 'max_attempts', 'run_after', 'last_error', 'created', 'updated')
+    actions = ['relancer']
+
+    def has_add_permission(self, request):
+        return False
+
+    def relancer(self, request, queryset):
+        count = queryset.exclude(status='running').update(status='pending', attempts=0, run_after=timezone.now())
+        self.message_user(request, f"{count} tâches remises en file.")
+    relancer.short_description = "Relancer les tâches sélectionnées"
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'subject', 'destinataires', 'status', 'attempts', 'run_after', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'to')
+    readonly_fields = ('subject', 'body', 'html_body', 'from_email', 'to', 'cc', 'status', 'attempts', 'max_attempts', 'run_after', 'last_error', 'created', 'updated', 'sent_at')
+    actions = ['renvoyer']
+
+    def has_add_permission(self, request):
+        return False
+
+    def destinataires(self, obj):
+        return ', '.join(obj.to)
+    destinataires.short_description = 'Destinataires'
+
+    def renvoyer(self, request, queryset):
+        count = queryset.exclude(status='sending').update(status='pending', attempts=0, run_after=timezone.now())
+        self.message_user(request, f"{count} emails remis en file.")
+    renvoyer.short_description = "Remettre en file les emails sélectionnés"
+
+
 admin.site.register(Category)
 admin.site.register(Center, CenterAdmin)
 admin.site.register(ContactMessage, ContactAdmin)
@@ -170,12 +205,47 @@ class GalleryMediaInline(admin.TabularInline):
     verbose_name_plural = 'Médias'
 
 
+class GalleryImportInline(admin.TabularInline):
+    model = GalleryImport
+    extra = 0
+    max_num = 0
+    can_delete = False
+    fields = ('archive_name', 'status', 'progression', 'created', 'skipped', 'failed', 'started', 'finished')
+    readonly_fields = fields
+    verbose_name = 'Import ZIP'
+    verbose_name_plural = 'Imports ZIP récents'
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).order_by('-id')
+
+    def progression(self, obj):
+        return f"{obj.processed}/{obj.total} ({obj.percent} %)"
+    progression.short_description = 'Progression'
+
+
+@admin.register(GalleryImport)
+class GalleryImportAdmin(admin.ModelAdmin):
+    list_display = ('id', 'archive_name', 'collection', 'status', 'progression', 'created', 'skipped', 'failed', 'started', 'finished')
+    list_filter = ('status',)
+    readonly_fields = ('collection', 'archive_name', 'status', 'total', 'processed', 'created', 'skipped', 'failed', 'error', 'started', 'updated', 'finished')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def progression(self, obj):
+        return f"{obj.processed}/{obj.total} ({obj.percent} %)"
+    progression.short_description = 'Progression'
+
+
 @admin.register(GalleryCollection)
 class GalleryCollectionAdmin(admin.ModelAdmin):
     list_display = ('name', 'source_folder', 'slug', 'created', 'media_count')
     search_fields = ('name', 'source_folder')
     readonly_fields = ('slug',)
-    inlines = [GalleryMediaInline]
+    inlines = [GalleryMediaInline, GalleryImportInline]
     actions = ['importer_medias', 'exporter_zip', 'vider_medias']
 
     # Champ additionnel pour importer un dossier (upload multiple)
@@ -198,10 +268,14 @@ class GalleryCollectionAdmin(admin.ModelAdmin):
     media_count.short_description = 'Médias'
 
     def importer_medias(self, request, queryset):
-        total = 0
+        created = skipped = failed = 0
         for coll in queryset:
-            total += coll.import_media() or 0
-        self.message_user(request, f"Import terminé. {total} fichiers traités.")
+            result = import_folder(coll)
+            created += result.created
+            skipped += result.skipped
+            failed += result.failed
+        level = 'warning' if failed else 'info'
+        self.message_user(request, f"Import terminé. {created} médias ajoutés, {skipped} déjà présents, {failed} en échec.", level=level)
     importer_medias.short_description = "Importer / Mettre à jour les médias depuis le dossier source"
 
     def save_model(self, request, obj, form, change):
@@ -210,43 +284,26 @@ class GalleryCollectionAdmin(admin.ModelAdmin):
         zip_file = request.FILES.get('upload_zip')
         if not zip_file:
             return
-        import zipfile, io
-        try:
-            zf = zipfile.ZipFile(io.BytesIO(zip_file.read()))
-        except Exception:
-            self.message_user(request, "Le fichier fourni n'est pas une archive ZIP valide", level='error')
-            return
-        dest_base = Path(settings.MEDIA_ROOT) / 'gallery' / obj.slug
-        dest_base.mkdir(parents=True, exist_ok=True)
-        created = 0
-        for member in zf.namelist():
-            if member.endswith('/'):
-                continue
-            filename = Path(member).name
-            data = zf.read(member)
-            guessed, _ = mimetypes.guess_type(filename)
-            name_lower = filename.lower()
-            if guessed and guessed.startswith('image/'):
-                mtype = 'image'
-            elif guessed and guessed.startswith('video/'):
-                mtype = 'video'
-            else:
-                if name_lower.endswith(('.jpg', '.jpeg', '.png', '.webp', '.gif')):
-                    mtype = 'image'
-                elif name_lower.endswith(('.mp4', '.webm', '.ogg', '.ogv', '.mov')):
-                    mtype = 'video'
-                else:
-                    continue
-            rel_path = f"gallery/{obj.slug}/{filename}"
-            if not default_storage.exists(rel_path):
-                default_storage.save(rel_path, ContentFile(data))
-            GalleryMedia.objects.get_or_create(
-                collection=obj,
-                file=rel_path,
-                defaults={'media_type': mtype}
+        # Gros fichiers: Django les a déjà mis sur disque, on lit l'archive depuis ce fichier
+        # sans la recharger en mémoire; petits fichiers: l'objet en mémoire suffit.
+        archive = zip_file.temporary_file_path() if hasattr(zip_file, 'temporary_file_path') else zip_file
+
+        def run_import():
+            # Exécuté après le commit de l'admin: l'enregistrement de progression est
+            # visible depuis les autres requêtes pendant l'import.
+            result = import_zip(obj, archive, archive_name=zip_file.name)
+            if result.status == 'failed':
+                self.message_user(request, result.error, level='error')
+                return
+            level = 'warning' if result.failed else 'info'
+            self.message_user(
+                request,
+                f"ZIP importé: {result.created} médias ajoutés, {result.skipped} ignorés, {result.failed} en échec. "
+                "Les vignettes sont générées en arrière-plan.",
+                level=level,
             )
-            created += 1
-        self.message_user(request, f"{created} fichiers extraits du ZIP importés")
+
+        transaction.on_commit(run_import)
 
     def exporter_zip(self, request, queryset):
         # N'autoriser l'export que d'une seule collection à la fois pour créer un ZIP propre
@@ -254,21 +311,28 @@ class GalleryCollectionAdmin(admin.ModelAdmin):
             self.message_user(request, "Veuillez sélectionner exactement une collection pour exporter en ZIP.", level='error')
             return
         coll = queryset.first()
-        buffer = io.BytesIO()
-        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
-            for gm in coll.medias.all():
-                name = getattr(gm.file, 'name', None) or str(gm.file)
-                if not name:
-                    continue
-                try:
-                    with default_storage.open(name, 'rb') as f:
-                        data = f.read()
-                        arcname = Path(name).name
-                        zf.writestr(arcname, data)
-                except Exception:
-                    continue
-        buffer.seek(0)
-        resp = HttpResponse(buffer.getvalue(), content_type='application/zip')
+        # Archive produite en flux: mémoire constante quelle que soit la taille de l'album
+        entries = []
+        for gm in coll.medias.order_by('id'):
+            name = getattr(gm.file, 'name', None) or str(gm.file)
+            if not name:
+                continue
+            try:
+                size = default_storage.size(name)
+            except Exception:
+                continue
+            entries.append(ZipEntry(
+                Path(name).name,
+                size,
+                partial(default_storage.open, name, 'rb'),
+                date_time=timezone.localtime(gm.created).timetuple()[:6],
+            ))
+        resp = StreamingHttpResponse(iter_zip(entries), content_type='application/zip')
+        length = archive_size(entries)
+        if length is not None:
+            resp['Content-Length'] = str(length)
+        # Ne pas bufferiser côté nginx: le téléchargement démarre immédiatement
+        resp['X-Accel-Buffering'] = 'no'
         safe_slug = coll.slug or 'galerie'
         resp['Content-Disposition'] = f'attachment; filename="gallery_{safe_slug}.zip"'
         return resp
@@ -287,6 +351,12 @@ class GalleryCollectionAdmin(admin.ModelAdmin):
                         removed_files += 1
                     except Exception:
                         pass
+                # Vignettes / variantes srcset associées
+                for variant in gm.rendition_names():
+                    try:
+                        default_storage.delete(variant)
+                    except Exception:
+                        pass
             removed_entries += len(medias)
             coll.medias.all().delete()
         self.message_user(request, f"Médias supprimés: {removed_entries} (fichiers supprimés: {removed_files}).")
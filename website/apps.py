@@ -8,3 +8,6 @@ class WebsiteConfig(AppConfig):
 
     def ready(self):  # pragma: no cover
         from . import signals  # noqa: F401
+        from .building_gallery import refresh
+        # Manifeste des médias du siège construit une fois au démarrage
+        refresh()
@@ -0,0 +1,50 @@
+"""Rendu des articles: ancres des titres h2/h3, sommaire et temps de lecture.
+
+Calculé une seule fois à l'enregistrement du contenu (NewsItem.save) et stocké;
+la vue de détail ne fait que servir les champs enregistrés.
+"""
+import re
+
+from django.utils.html import linebreaks
+
+HEADING_RE = re.compile(r'<(h2|h3)>(.*?)</\1>', re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r'<.*?>')
+_NON_ID_RE = re.compile(r'[^\w\- ]+')
+# Vitesse de lecture approximative (mots par minute)
+WORDS_PER_MINUTE = 200
+
+
+def heading_id(text):
+    s = _TAG_RE.sub('', text)  # retirer le HTML interne
+    s = _NON_ID_RE.sub('', s).strip().lower().replace(' ', '-')
+    return s[:60]
+
+
+def reading_time(content):
+    word_count = len(content.split()) if content else 0
+    return max(1, round(word_count / WORDS_PER_MINUTE)) if word_count else 1
+
+
+def render_article(content):
+    """Retourne (html, sommaire, temps de lecture) pour le contenu brut d'une publication.
+
+    Les titres h2/h3 reçoivent un id (en un seul passage re.sub); sans titre, le contenu
+    est rendu avec `linebreaks` comme auparavant.
+    """
+    if not content:
+        return '', [], 1
+    toc = []
+
+    def anchor(match):
+        tag = match.group(1).lower()
+        inner = match.group(2)
+        hid = heading_id(inner)
+        if not hid:
+            return match.group(0)
+        toc.append({'id': hid, 'text': _TAG_RE.sub('', inner).strip(), 'level': int(tag[1])})
+        return f'<{tag} id="{hid}">{inner}</{tag}>'
+
+    html, count = HEADING_RE.subn(anchor, content)
+    if not count:
+        html = linebreaks(content)
+    return html, toc, reading_time(content)
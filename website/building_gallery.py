@@ -0,0 +1,78 @@
+"""Manifeste des médias 3D du projet de siège (static/img/building) pour la page À propos.
+
+Construit une fois (au démarrage, voir WebsiteConfig.ready) puis gardé en mémoire.
+Il n'est reconstruit que si la date de modification d'un des dossiers change (ajout,
+suppression ou renommage d'un fichier); cette vérification coûte quelques stat() et
+n'a lieu qu'au plus toutes les CHECK_INTERVAL secondes: la page ne parcourt plus les dossiers.
+"""
+import hashlib
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+IMAGE_EXTS = {'.jpg', '.jpeg', '.png', '.webp'}
+VIDEO_EXTS = {'.mp4', '.webm', '.ogg', '.mov'}
+SUBDIR = Path('img') / 'building'
+# Intervalle minimal (s) entre deux vérifications des dates de modification
+CHECK_INTERVAL = 30
+
+_lock = threading.Lock()
+_state = {'items': None, 'mtimes': None, 'version': '', 'checked': 0.0}
+
+
+def _roots():
+    # Racine static principale de l'app puis dossiers static additionnels
+    roots = [Path(settings.BASE_DIR) / 'eej_site' / 'static']
+    roots += [Path(p) for p in getattr(settings, 'STATICFILES_DIRS', [])]
+    return roots
+
+
+def _folder_mtimes():
+    mtimes = []
+    for root in _roots():
+        try:
+            mtimes.append((str(root), (root / SUBDIR).stat().st_mtime_ns))
+        except OSError:
+            mtimes.append((str(root), None))
+    return tuple(mtimes)
+
+
+def scan():
+    """Parcourt les dossiers et retourne la liste [{'type', 'url'}] (chemins relatifs à static)."""
+    items = []
+    seen = set()
+    for root in _roots():
+        folder = root / SUBDIR
+        if not folder.is_dir():
+            continue
+        for entry in sorted(folder.iterdir()):
+            if not entry.is_file():
+                continue
+            ext = entry.suffix.lower()
+            if ext in IMAGE_EXTS or ext in VIDEO_EXTS:
+                rel = entry.relative_to(root).as_posix()  # ex: img/building/render1.jpg
+                if rel in seen:
+                    continue
+                seen.add(rel)
+                items.append({'type': 'image' if ext in IMAGE_EXTS else 'video', 'url': rel})
+    return items
+
+
+def refresh(force=False):
+    """Reconstruit le manifeste si un dossier a changé (ou si `force`)."""
+    with _lock:
+        mtimes = _folder_mtimes()
+        if force or _state['items'] is None or mtimes != _state['mtimes']:
+            _state['items'] = scan()
+            _state['mtimes'] = mtimes
+            _state['version'] = hashlib.md5(repr(mtimes).encode('utf-8')).hexdigest()[:8]
+        _state['checked'] = time.monotonic()
+
+
+def manifest():
+    """(items, version) — `version` change dès que le contenu des dossiers change."""
+    if _state['items'] is None or time.monotonic() - _state['checked'] >= CHECK_INTERVAL:
+        refresh()
+    return _state['items'], _state['version']
@@ -0,0 +1,85 @@
+"""Indicateurs du tableau de bord de l'équipe (views_admin.dashboard).
+
+Une requête d'agrégats conditionnels par modèle (compteurs et série hebdomadaire dans le
+même SELECT), résultat mis en cache quelques instants. Les signaux post_save / post_delete
+de NewsItem, ContactMessage et Center suppriment l'entrée: le tableau de bord reflète une
+modification dès le chargement suivant sans interroger la base à chaque ouverture.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+CACHE_KEY = 'dashboard:metrics'
+CACHE_TTL = 60
+WEEKS = 12
+LATEST_COUNT = 5
+
+
+def _weeks(now):
+    """Débuts (lundi 00:00, heure locale) des WEEKS dernières semaines, la plus ancienne d'abord."""
+    today = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    monday = today - timedelta(days=today.weekday())
+    return [monday - timedelta(weeks=i) for i in reversed(range(WEEKS))]
+
+
+def _weekly(field, weeks):
+    # Une colonne COUNT(... FILTER) par semaine
+    bounds = weeks[1:] + [None]
+    return {
+        f'w{i}': Count('id', filter=Q(**{f'{field}__gte': start}) & (Q(**{f'{field}__lt': end}) if end else Q()))
+        for i, (start, end) in enumerate(zip(weeks, bounds))
+    }
+
+
+def compute(now=None):
+    from .models import Center, ContactMessage, NewsItem
+    now = now or timezone.now()
+    weeks = _weeks(now)
+    # Un événement est futur si event_end >= now, sinon si event_start >= now, sinon si date_event >= now
+    future = Q(type='event', status='published') & (
+        Q(event_end__gte=now)
+        | Q(event_end__isnull=True, event_start__gte=now)
+        | Q(event_end__isnull=True, event_start__isnull=True, date_event__gte=now)
+    )
+    news = NewsItem.objects.aggregate(
+        total=Count('id'),
+        published=Count('id', filter=Q(status='published')),
+        future_events=Count('id', filter=future),
+        **_weekly('created', weeks),
+    )
+    messages = ContactMessage.objects.aggregate(
+        pending=Count('id', filter=Q(handled=False)),
+        **_weekly('created', weeks),
+    )
+    latest = [
+        {'id': pk, 'title': title, 'type': dict(NewsItem.TYPE_CHOICES).get(kind, kind), 'status': status, 'created': created}
+        for pk, title, kind, status, created in NewsItem.objects.order_by('-created')
+        .values_list('id', 'title', 'type', 'status', 'created')[:LATEST_COUNT]
+    ]
+    return {
+        'total_news': news['total'],
+        'published_news': news['published'],
+        'future_events': news['future_events'],
+        'pending_messages': messages['pending'],
+        'centers_count': Center.objects.count(),
+        'latest_news': latest,
+        'weekly': [
+            {'week': start.date(), 'news': news[f'w{i}'], 'messages': messages[f'w{i}']}
+            for i, start in enumerate(weeks)
+        ],
+        'computed_at': now,
+    }
+
+
+def metrics():
+    data = cache.get(CACHE_KEY)
+    if data is None:
+        data = compute()
+        cache.set(CACHE_KEY, data, CACHE_TTL)
+    return data
+
+
+def invalidate(**kwargs):
+    cache.delete(CACHE_KEY)
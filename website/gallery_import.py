@@ -0,0 +1,279 @@
+"""Import en masse des médias de galerie depuis un dossier source ou une archive ZIP.
+
+Dossier: la copie, la validation, le hachage et la génération des variantes de chaque
+fichier sont répartis sur un pool de processus.
+ZIP: chaque membre est copié en flux vers le stockage (jamais chargé entièrement en mémoire).
+Dans les deux cas, les lignes GalleryMedia sont insérées par lots (`bulk_create`) dans une
+transaction.
+
+NB: ce module ne doit pas importer les modèles au niveau global, les workers du pool
+(mode "spawn") le réimportent sans que Django soit initialisé.
+"""
+import hashlib
+import mimetypes
+import os
+import shutil
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image
+
+from .renditions import GALLERY_WIDTHS, build_variants
+
+IMAGE_EXTS = {'.jpg', '.jpeg', '.png', '.webp', '.gif'}
+VIDEO_EXTS = {'.mp4', '.webm', '.ogg', '.ogv', '.mov'}
+
+CHUNK_SIZE = 1024 * 1024
+DEFAULT_BATCH_SIZE = 100
+
+
+def guess_media_type(filename):
+    """'image', 'video' ou None selon le mimetype puis l'extension."""
+    guessed, _ = mimetypes.guess_type(filename)
+    if guessed and guessed.startswith('image/'):
+        return 'image'
+    if guessed and guessed.startswith('video/'):
+        return 'video'
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in IMAGE_EXTS:
+        return 'image'
+    if ext in VIDEO_EXTS:
+        return 'video'
+    return None
+
+
+def default_workers():
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    skipped: int = 0
+    failed: int = 0
+
+
+def _copy_and_hash(src, dest):
+    """Copie src → dest en un seul passage (si dest absent) et retourne (taille, sha256)."""
+    digest = hashlib.sha256()
+    size = 0
+    if os.path.exists(dest):
+        with open(dest, 'rb') as f_in:
+            for chunk in iter(lambda: f_in.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                size += len(chunk)
+        return size, digest.hexdigest()
+    with open(src, 'rb') as f_in, open(dest, 'wb') as f_out:
+        for chunk in iter(lambda: f_in.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+            size += len(chunk)
+            f_out.write(chunk)
+    shutil.copystat(src, dest)
+    return size, digest.hexdigest()
+
+
+def process_file(task):
+    """Traitement d'un fichier dans un worker du pool (aucun accès ORM).
+
+    task = (chemin source, chemin destination, type de média)
+    """
+    src, dest, media_type = task
+    try:
+        size, checksum = _copy_and_hash(src, dest)
+        renditions = {}
+        if media_type == 'image':
+            with Image.open(dest) as im:
+                im.verify()  # lève une exception si le fichier est tronqué/corrompu
+            renditions = build_variants(dest, GALLERY_WIDTHS)
+        elif size == 0:
+            raise ValueError("fichier vide")
+        return {'dest': dest, 'media_type': media_type, 'size': size, 'checksum': checksum,
+                'renditions': renditions, 'error': ''}
+    except Exception as exc:
+        return {'dest': dest, 'media_type': media_type, 'error': str(exc) or exc.__class__.__name__}
+
+
+def run_tasks(tasks, workers=None):
+    """Exécute `process_file` sur les tâches, en parallèle si plusieurs workers."""
+    workers = workers or default_workers()
+    if workers <= 1 or len(tasks) <= 1:
+        yield from map(process_file, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(process_file, tasks, chunksize=4)
+
+
+def import_folder(collection, workers=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Importe le dossier source de `collection` vers MEDIA_ROOT/gallery/<slug>/.
+
+    Les fichiers déjà référencés par la collection sont ignorés.
+    """
+    from django.conf import settings
+    from django.db import transaction
+    from . import viewcache
+    from .models import GalleryMedia
+
+    result = ImportResult()
+    media_root = Path(settings.MEDIA_ROOT)
+    base_src = (media_root / 'gallery_sources').resolve()
+    src = (base_src / collection.source_folder).resolve()
+    # Sécurité: src doit être sous base_src
+    try:
+        src.relative_to(base_src)
+    except ValueError:
+        return result
+    if not src.is_dir():
+        return result
+    dest_base = media_root / 'gallery' / collection.slug
+    dest_base.mkdir(parents=True, exist_ok=True)
+
+    existing = set(GalleryMedia.objects.filter(collection=collection).values_list('file', flat=True))
+    tasks = []
+    for entry in sorted(src.iterdir()):
+        if not entry.is_file():
+            continue
+        media_type = guess_media_type(entry.name)
+        if not media_type:
+            continue
+        dest_path = dest_base / entry.name
+        if dest_path.relative_to(media_root).as_posix() in existing:
+            result.skipped += 1
+            continue
+        tasks.append((str(entry), str(dest_path), media_type))
+
+    batch = []
+
+    def flush():
+        with transaction.atomic():
+            GalleryMedia.objects.bulk_create(batch)
+        result.created += len(batch)
+        batch.clear()
+        # bulk_create n'émet pas post_save: invalider le cache de la galerie explicitement
+        viewcache.bump('gallery')
+
+    for res in run_tasks(tasks, workers):
+        if res['error']:
+            result.failed += 1
+            continue
+        batch.append(GalleryMedia(
+            collection=collection,
+            file=Path(res['dest']).relative_to(media_root).as_posix(),
+            media_type=res['media_type'],
+            size=res['size'],
+            checksum=res['checksum'],
+            renditions=res['renditions'],
+        ))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return result
+
+
+class _HashingReader:
+    """Enveloppe en lecture seule qui calcule taille et sha256 au fil de la copie."""
+
+    def __init__(self, fileobj, name):
+        self._fileobj = fileobj
+        self.name = name
+        self.size = 0
+        self.digest = hashlib.sha256()
+
+    def read(self, n=-1):
+        data = self._fileobj.read(n)
+        self.digest.update(data)
+        self.size += len(data)
+        return data
+
+
+def _member_checksum(zf, info):
+    digest = hashlib.sha256()
+    with zf.open(info) as src:
+        for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def import_zip(collection, archive, archive_name='', batch_size=DEFAULT_BATCH_SIZE):
+    """Importe une archive ZIP (chemin disque ou fichier ouvert) dans `collection`.
+
+    Les membres déjà présents (même nom, même taille, même sha256) sont ignorés.
+    La progression est tenue à jour dans un enregistrement GalleryImport, retourné à la fin.
+    Les variantes des images sont confiées au worker de tâches.
+    """
+    from django.core.files import File
+    from django.core.files.storage import default_storage
+    from django.db import transaction
+    from django.utils import timezone
+    from . import viewcache
+    from .jobs import enqueue
+    from .models import GalleryImport, GalleryMedia
+
+    progress = GalleryImport.objects.create(collection=collection, archive_name=archive_name[:255])
+    existing = {
+        row['file']: row
+        for row in GalleryMedia.objects.filter(collection=collection).values('file', 'size', 'checksum')
+    }
+    batch = []
+
+    def flush():
+        with transaction.atomic():
+            created = GalleryMedia.objects.bulk_create(batch)
+        viewcache.bump('gallery')
+        image_ids = [gm.pk for gm in created if gm.media_type == 'image' and gm.pk]
+        if image_ids:
+            enqueue('gallery.renditions', {'ids': image_ids})
+        progress.created += len(batch)
+        batch.clear()
+
+    try:
+        with zipfile.ZipFile(archive) as zf:
+            members = [info for info in zf.infolist() if not info.is_dir()]
+            progress.total = len(members)
+            progress.save(update_fields=['total', 'updated'])
+            for info in members:
+                filename = Path(info.filename).name
+                media_type = guess_media_type(filename)
+                rel_path = f"gallery/{collection.slug}/{filename}"
+                known = existing.get(rel_path)
+                if not media_type:
+                    progress.skipped += 1
+                elif known and known['size'] == info.file_size and known['checksum'] in ('', _member_checksum(zf, info)):
+                    # Déjà importé (les anciennes lignes sans empreinte se comparent à la taille seule)
+                    progress.skipped += 1
+                else:
+                    try:
+                        with zf.open(info) as src:
+                            reader = _HashingReader(src, filename)
+                            saved_name = default_storage.save(rel_path, File(reader, name=filename))
+                    except Exception:
+                        progress.failed += 1
+                    else:
+                        batch.append(GalleryMedia(
+                            collection=collection,
+                            file=saved_name,
+                            media_type=media_type,
+                            size=reader.size,
+                            checksum=reader.digest.hexdigest(),
+                        ))
+                        existing[saved_name] = {'size': reader.size, 'checksum': reader.digest.hexdigest()}
+                        if len(batch) >= batch_size:
+                            flush()
+                progress.processed += 1
+                if progress.processed % 10 == 0:
+                    progress.save(update_fields=['processed', 'created', 'skipped', 'failed', 'updated'])
+            if batch:
+                flush()
+    except zipfile.BadZipFile:
+        progress.status = 'failed'
+        progress.error = "Le fichier fourni n'est pas une archive ZIP valide"
+    except Exception as exc:
+        progress.status = 'failed'
+        progress.error = str(exc) or exc.__class__.__name__
+    else:
+        progress.status = 'done'
+    progress.finished = timezone.now()
+    progress.save()
+    return progress
@@ -0,0 +1,46 @@
+"""Accès en lecture à l'enregistrement unique ImpactMetrics (chiffres d'impact).
+
+Les chiffres changent quelques fois par an: l'enregistrement est gardé en mémoire du
+processus et dans le cache, sous le numéro de version du groupe 'metrics' (ContentVersion,
+incrémenté en base par les signaux de ImpactMetrics, voir website/viewcache.py). Une
+modification faite depuis n'importe quel processus (autre worker, `manage.py shell`,
+`loaddata` suivi d'un bump) change la version: chaque processus relit alors la ligne au
+lieu de servir sa copie. La lecture de la version est mémorisée pour la requête.
+Seules les vues `about` et `donate` l'utilisent: leur validation conditionnelle lit déjà la
+version 'metrics', les autres pages n'en paient pas la lecture.
+"""
+import threading
+
+from django.core.cache import cache
+
+from . import viewcache
+
+CACHE_KEY = 'impact_metrics:{version}'
+
+_lock = threading.Lock()
+_local = {'version': None, 'value': None}
+
+
+def current(request=None):
+    """L'enregistrement ImpactMetrics (ou None s'il n'a pas encore été créé)."""
+    from .models import ImpactMetrics
+    version = viewcache.versions(('metrics',), request)['metrics'][0]
+    with _lock:
+        if _local['value'] is not None and _local['version'] == version:
+            return _local['value']['metrics']
+    key = CACHE_KEY.format(version=version)
+    data = cache.get(key)
+    if data is None:
+        data = {'metrics': ImpactMetrics.objects.order_by('pk').first()}
+        cache.set(key, data, viewcache.timeout())
+    with _lock:
+        _local['version'] = version
+        _local['value'] = data
+    return data['metrics']
+
+
+def invalidate():
+    """Oublie la copie en mémoire du processus (les versions suffisent en fonctionnement normal)."""
+    with _lock:
+        _local['version'] = None
+        _local['value'] = None
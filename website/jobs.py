@@ -0,0 +1,122 @@
+"""File de tâches de fond adossée à la base de données.
+
+Les vues / save() enfilent des tâches via `enqueue()`; le worker `manage.py run_jobs`
+les exécute hors requête HTTP, avec reprise (backoff exponentiel) et suivi de progression.
+"""
+import logging
+import traceback
+
+from django.utils import timezone
+
+from .models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+# Délai de base entre deux tentatives (doublé à chaque échec)
+RETRY_BASE_SECONDS = 30
+# Une tâche "running" plus ancienne est considérée abandonnée (worker arrêté brutalement)
+STALE_AFTER = timezone.timedelta(minutes=30)
+
+
+def handler(kind):
+    """Décorateur: enregistre la fonction exécutant les tâches de type `kind`."""
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, payload=None, unique=False, max_attempts=3):
+    """Ajoute une tâche. Avec `unique`, réutilise une tâche identique encore en attente."""
+    payload = payload or {}
+    if unique:
+        existing = BackgroundJob.objects.filter(kind=kind, payload=payload, status='pending').first()
+        if existing:
+            return existing
+    return BackgroundJob.objects.create(kind=kind, payload=payload, max_attempts=max_attempts)
+
+
+def requeue_stale(now=None):
+    now = now or timezone.now()
+    return BackgroundJob.objects.filter(status='running', updated__lt=now - STALE_AFTER).update(status='pending')
+
+
+def claim_next(now=None):
+    """Réserve la prochaine tâche exécutable (mise à jour conditionnelle, sûre entre workers)."""
+    now = now or timezone.now()
+    candidates = BackgroundJob.objects.filter(status='pending', run_after__lte=now).order_by('id').values_list('id', flat=True)[:5]
+    for job_id in candidates:
+        claimed = BackgroundJob.objects.filter(id=job_id, status='pending').update(status='running', updated=now)
+        if claimed:
+            return BackgroundJob.objects.get(id=job_id)
+    return None
+
+
+def run_job(job):
+    func = HANDLERS.get(job.kind)
+    job.attempts += 1
+
+    def progress(pct):
+        job.progress = max(0, min(100, int(pct)))
+        BackgroundJob.objects.filter(pk=job.pk).update(progress=job.progress, updated=timezone.now())
+
+    try:
+        if func is None:
+            raise LookupError(f"Tâche inconnue: aucun handler pour '{job.kind}'")
+        func(progress=progress, **job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc(limit=5)
+        if job.attempts < job.max_attempts:
+            job.status = 'pending'
+            job.run_after = timezone.now() + timezone.timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (job.attempts - 1))
+        else:
+            job.status = 'failed'
+        logger.warning("Tâche %s en échec (tentative %s/%s)", job, job.attempts, job.max_attempts)
+    else:
+        job.status = 'done'
+        job.progress = 100
+        job.last_error = ''
+    job.save(update_fields=['status', 'progress', 'attempts', 'run_after', 'last_error', 'updated'])
+    return job
+
+
+def run_pending(limit=None):
+    """Exécute les tâches disponibles; retourne le nombre de tâches traitées."""
+    done = 0
+    while limit is None or done < limit:
+        job = claim_next()
+        if job is None:
+            break
+        run_job(job)
+        done += 1
+    return done
+
+
+@handler('newsitem.renditions')
+def newsitem_renditions(pk, progress):
+    from .models import NewsItem
+    item = NewsItem.objects.filter(pk=pk).first()
+    if item is None:
+        return
+    item.build_renditions(progress=progress)
+
+
+@handler('newsmedia.renditions')
+def newsmedia_renditions(pk, progress):
+    from .models import NewsMedia
+    media = NewsMedia.objects.filter(pk=pk).first()
+    if media is None:
+        return
+    media.build_renditions()
+
+
+@handler('gallery.renditions')
+def gallery_renditions(ids, progress):
+    from .models import GalleryMedia
+    medias = list(GalleryMedia.objects.filter(pk__in=ids, media_type='image'))
+    for i, media in enumerate(medias, 1):
+        if not media.renditions:
+            media.build_renditions()
+        progress(i * 100 / len(medias))
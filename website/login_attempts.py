@@ -0,0 +1,93 @@
+"""Compteurs d'échecs de connexion à l'administration, par adresse IP et par identifiant.
+
+Les compteurs et verrous sont tenus dans le cache (et non dans la session): une visite
+publique ne crée ni session ni cookie. Le middleware ne lit ces compteurs que sur la page
+de connexion de l'admin; les signaux d'authentification les mettent à jour.
+
+Après FAIL_THRESHOLD échecs (pour une même IP ou un même identifiant) dans la fenêtre
+FAIL_WINDOW_MINUTES, les tentatives sont refusées pendant LOCK_MINUTES. Avec LocMemCache
+les compteurs sont propres à chaque processus; un cache partagé (Redis, Memcached, base)
+les rend communs à tous les workers.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+
+FAIL_THRESHOLD = 3
+LOCK_MINUTES = 2
+FAIL_WINDOW_MINUTES = 15
+
+FAIL_KEY = 'login:fail:{scope}'
+LOCK_KEY = 'login:lock:{scope}'
+
+
+def client_ip(request):
+    # Derrière nginx ($proxy_add_x_forwarded_for), la dernière adresse est celle vue par le proxy
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    if forwarded:
+        return forwarded.split(',')[-1].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _scopes(request, username=None):
+    scopes = ['ip:' + client_ip(request)]
+    username = (username or '').strip().lower()
+    if username:
+        # Empreinte: clé de cache sûre quel que soit l'identifiant saisi
+        scopes.append('user:' + hashlib.sha256(username.encode('utf-8')).hexdigest()[:32])
+    return scopes
+
+
+def status(request, username=None):
+    """(nombre d'échecs, secondes de verrouillage restantes) pour l'IP et l'identifiant."""
+    keys = []
+    for scope in _scopes(request, username):
+        keys += [FAIL_KEY.format(scope=scope), LOCK_KEY.format(scope=scope)]
+    values = cache.get_many(keys)
+    now = time.time()
+    fail_count = 0
+    remaining = 0
+    for scope in _scopes(request, username):
+        fail_count = max(fail_count, values.get(FAIL_KEY.format(scope=scope), 0))
+        lock_until = values.get(LOCK_KEY.format(scope=scope))
+        if lock_until:
+            remaining = max(remaining, int(lock_until - now))
+    return fail_count, remaining
+
+
+def annotate(request, username=None):
+    """Renseigne login_fail_count / login_locked / login_lock_remaining (gabarit admin/login.html)."""
+    fail_count, remaining = status(request, username)
+    request.login_fail_count = fail_count
+    request.login_locked = remaining > 0
+    request.login_lock_remaining = remaining
+
+
+def record_failure(request, username=None):
+    """Compte un échec; verrouille l'IP / l'identifiant au seuil. Sans effet si déjà verrouillé."""
+    now = time.time()
+    for scope in _scopes(request, username):
+        if cache.get(LOCK_KEY.format(scope=scope)):
+            continue
+        fail_key = FAIL_KEY.format(scope=scope)
+        if cache.add(fail_key, 1, FAIL_WINDOW_MINUTES * 60):
+            count = 1
+        else:
+            try:
+                count = cache.incr(fail_key)
+            except ValueError:
+                # Expiré entre add() et incr()
+                cache.set(fail_key, 1, FAIL_WINDOW_MINUTES * 60)
+                count = 1
+        if count >= FAIL_THRESHOLD:
+            cache.set(LOCK_KEY.format(scope=scope), now + LOCK_MINUTES * 60, LOCK_MINUTES * 60)
+            # Le compteur repart de zéro à la fin du verrouillage
+            cache.set(fail_key, count, LOCK_MINUTES * 60)
+
+
+def reset(request, username=None):
+    keys = []
+    for scope in _scopes(request, username):
+        keys += [FAIL_KEY.format(scope=scope), LOCK_KEY.format(scope=scope)]
+    cache.delete_many(keys)
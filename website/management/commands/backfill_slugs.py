@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from website.models import Category, GalleryCollection, NewsItem
+
+# Modèle → champ dont le slug est dérivé
+SOURCES = ((Category, 'name'), (NewsItem, 'title'), (GalleryCollection, 'name'))
+
+
+class Command(BaseCommand):
+    help = "Attribue un slug unique aux enregistrements anciens qui n'en ont pas (NULL ou vide)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Compter sans rien modifier")
+
+    def handle(self, *args, **options):
+        for model, source in SOURCES:
+            missing = model.objects.filter(Q(slug__isnull=True) | Q(slug='')).exclude(**{source: ''}).order_by('pk')
+            if options['dry_run']:
+                self.stdout.write(f"{model._meta.verbose_name_plural}: {missing.count()} sans slug.")
+                continue
+            done = 0
+            # Liste figée: les lignes modifiées sortent du filtre pendant le parcours
+            for obj in list(missing):
+                # save() attribue le slug (website/slugs.py); les signaux tiennent index et caches à jour
+                obj.save(update_fields=['slug'])
+                done += 1
+            self.stdout.write(self.style.SUCCESS(f"{model._meta.verbose_name_plural}: {done} slugs attribués."))
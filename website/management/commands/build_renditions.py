@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+
+from website.models import NewsItem, NewsMedia, GalleryMedia
+from website.renditions import VARIANT_WIDTHS, build_variants
+
+
+class Command(BaseCommand):
+    help = ("Génère les variantes srcset manquantes et enregistre leur manifeste "
+            "(couvertures de publications, médias de publications, galerie).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=['news', 'media', 'gallery'], help="Limiter à un type de contenu")
+        parser.add_argument('--collection', help="Slug d'une collection de galerie")
+        parser.add_argument('--force', action='store_true', help="Retraiter même si un manifeste existe déjà")
+
+    def handle(self, *args, **options):
+        only = options['only']
+        force = options['force']
+        if only in (None, 'news'):
+            self._report('Couvertures', self._news(force))
+        if only in (None, 'media'):
+            qs = NewsMedia.objects.filter(media_type='image')
+            self._report('Médias de publications', self._run(qs, force))
+        if only in (None, 'gallery'):
+            qs = GalleryMedia.objects.filter(media_type='image')
+            if options['collection']:
+                qs = qs.filter(collection__slug=options['collection'])
+            self._report('Galerie', self._run(qs, force))
+
+    def _news(self, force):
+        # Couvertures déjà optimisées (statut "ready") dont le manifeste n'a jamais été enregistré
+        qs = NewsItem.objects.filter(rendition_status='ready').exclude(image='')
+        if not force:
+            qs = qs.filter(image_renditions={})
+        done = failed = 0
+        for item in qs.iterator():
+            try:
+                manifest = build_variants(item.image.path, VARIANT_WIDTHS)
+            except Exception:
+                failed += 1
+                continue
+            NewsItem.objects.filter(pk=item.pk).update(image_renditions=manifest)
+            done += 1
+        return done, failed
+
+    def _run(self, qs, force):
+        if not force:
+            qs = qs.filter(renditions={})
+        done = failed = 0
+        for obj in qs.order_by('id').iterator():
+            try:
+                ok = obj.build_renditions()
+            except Exception:
+                ok = False
+            if ok is False:
+                failed += 1
+            else:
+                done += 1
+        return done, failed
+
+    def _report(self, label, counts):
+        done, failed = counts
+        self.stdout.write(self.style.SUCCESS(f"{label}: {done} images traitées, {failed} en échec."))
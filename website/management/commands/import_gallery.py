@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from website.gallery_import import DEFAULT_BATCH_SIZE, default_workers, import_folder
+from website.models import GalleryCollection
+
+
+class Command(BaseCommand):
+    help = ("Importe le dossier source d'une collection (media/gallery_sources/<dossier>) : "
+            "copie, validation, hachage et variantes en parallèle, insertion par lots.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('collection', help="Slug ou identifiant de la collection")
+        parser.add_argument('--folder', help="Définir (et enregistrer) le sous-dossier source avant import")
+        parser.add_argument('--workers', type=int, default=default_workers(), help="Nombre de processus (1 = séquentiel)")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Lignes insérées par transaction")
+
+    def handle(self, *args, **options):
+        ref = options['collection']
+        lookup = {'pk': int(ref)} if ref.isdigit() else {'slug': ref}
+        try:
+            coll = GalleryCollection.objects.get(**lookup)
+        except GalleryCollection.DoesNotExist:
+            raise CommandError(f"Collection introuvable: {ref}")
+        if options['folder'] is not None:
+            coll.source_folder = options['folder']
+            coll.save(update_fields=['source_folder'])
+        if not coll.source_folder:
+            raise CommandError("Aucun dossier source défini pour cette collection (utiliser --folder).")
+        result = import_folder(coll, workers=options['workers'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{coll.name}: {result.created} médias ajoutés, {result.skipped} déjà présents, {result.failed} en échec."
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from website.search import fts_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index plein texte (FTS5) des publications."
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError("Index FTS5 indisponible (base non SQLite ou migration 0017 non appliquée).")
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"{count} publications indexées."))
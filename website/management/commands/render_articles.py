@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from website.models import NewsItem
+
+
+class Command(BaseCommand):
+    help = "Calcule le HTML, le sommaire et le temps de lecture enregistrés des publications."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Recalculer aussi les publications déjà rendues")
+
+    def handle(self, *args, **options):
+        qs = NewsItem.objects.only('id', 'content', 'article_html')
+        if not options['force']:
+            qs = qs.filter(article_html='').exclude(content='')
+        done = 0
+        for item in qs.iterator(chunk_size=200):
+            item.render_article()
+            # update() plutôt que save(): pas de signaux ni de tâches relancées
+            NewsItem.objects.filter(pk=item.pk).update(
+                article_html=item.article_html, toc=item.toc, read_time=item.read_time,
+            )
+            done += 1
+        self.stdout.write(self.style.SUCCESS(f"{done} publications rendues."))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from website import jobs
+
+
+class Command(BaseCommand):
+    help = "Worker des tâches de fond (optimisation d'images, variantes...). Tourne en boucle sauf --once."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Traiter les tâches disponibles puis quitter")
+        parser.add_argument('--sleep', type=float, default=5.0, help="Pause (s) quand la file est vide")
+        parser.add_argument('--limit', type=int, default=None, help="Nombre max de tâches par passage")
+
+    def handle(self, *args, **options):
+        requeued = jobs.requeue_stale()
+        if requeued:
+            self.stdout.write(f"{requeued} tâches abandonnées remises en file.")
+        try:
+            while True:
+                done = jobs.run_pending(limit=options['limit'])
+                if done:
+                    self.stdout.write(f"{done} tâches traitées.")
+                if options['once']:
+                    break
+                if not done:
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            self.stdout.write("Arrêt du worker.")
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from website import outbox
+
+
+class Command(BaseCommand):
+    help = "Worker d'envoi des emails en file (une connexion SMTP par lot). Tourne en boucle sauf --once."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Vider la file disponible puis quitter")
+        parser.add_argument('--sleep', type=float, default=5.0, help="Pause (s) quand la file est vide")
+        parser.add_argument('--batch-size', type=int, default=outbox.DEFAULT_BATCH_SIZE, help="Emails par connexion SMTP")
+
+    def handle(self, *args, **options):
+        requeued = outbox.requeue_stale()
+        if requeued:
+            self.stdout.write(f"{requeued} emails abandonnés remis en file.")
+        try:
+            while True:
+                sent, failed = outbox.send_batch(options['batch_size'])
+                if sent or failed:
+                    self.stdout.write(f"{sent} emails envoyés, {failed} en échec.")
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            self.stdout.write("Arrêt du worker.")
@@ -1,38 +1,23 @@
+from django.http import HttpResponseRedirect
+from django.urls import reverse
 from django.utils.deprecation import MiddlewareMixin
 
+from . import login_attempts
+
 
 class LoginAttemptMiddleware(MiddlewareMixin):
-    """Expose compteur et état de verrouillage pour la page admin login."""
-    FAIL_KEY = 'admin_login_fail_count'
-    LOCK_UNTIL_KEY = 'admin_login_lock_until'
-    FAIL_THRESHOLD = 3
-    LOCK_MINUTES = 2
+    """Expose compteur et état de verrouillage pour la page admin login.
+
+    N'intervient que sur l'URL de connexion de l'admin et ne touche pas à la session:
+    les autres pages restent sans session ni Set-Cookie (voir website/login_attempts.py).
+    """
 
     def process_request(self, request):
-        from django.utils import timezone
-        # Initialisation compteur
-        if self.FAIL_KEY not in request.session:
-            request.session[self.FAIL_KEY] = 0
-        fail_count = request.session.get(self.FAIL_KEY, 0)
-        lock_until_ts = request.session.get(self.LOCK_UNTIL_KEY)
-        locked = False
-        remaining_seconds = 0
-        if lock_until_ts:
-            # lock_until_ts stocké en isoformat
-            try:
-                lock_until = timezone.datetime.fromisoformat(lock_until_ts)
-                if timezone.now() < lock_until:
-                    locked = True
-                    delta = lock_until - timezone.now()
-                    remaining_seconds = int(delta.total_seconds())
-                else:
-                    # Expiré : reset
-                    request.session.pop(self.LOCK_UNTIL_KEY, None)
-                    request.session[self.FAIL_KEY] = 0
-                    fail_count = 0
-            except Exception:
-                # En cas de parsing foireux, suppression
-                request.session.pop(self.LOCK_UNTIL_KEY, None)
-        request.login_fail_count = fail_count
-        request.login_locked = locked
-        request.login_lock_remaining = remaining_seconds
+        if request.path != reverse('admin:login'):
+            return None
+        username = request.POST.get('username') if request.method == 'POST' else None
+        login_attempts.annotate(request, username)
+        if request.method == 'POST' and request.login_locked:
+            # Verrouillé: pas de tentative d'authentification, retour au formulaire
+            return HttpResponseRedirect(request.get_full_path())
+        return None
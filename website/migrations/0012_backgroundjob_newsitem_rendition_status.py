@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def mark_existing_ready(apps, schema_editor):
+    # Les couvertures existantes ont déjà été optimisées de façon synchrone par l'ancien save()
+    NewsItem = apps.get_model('website', 'NewsItem')
+    NewsItem.objects.exclude(image='').exclude(image__isnull=True).update(rendition_status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0011_gallerymedia_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsitem',
+            name='rendition_status',
+            field=models.CharField(choices=[('none', 'Aucune image'), ('pending', 'En attente'), ('processing', 'En cours'), ('ready', 'Prête'), ('failed', 'Échec')], default='none', editable=False, max_length=12, verbose_name="Variantes d'image"),
+        ),
+        migrations.CreateModel(
+            name='BackgroundJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(db_index=True, max_length=64, verbose_name='Type')),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('running', 'En cours'), ('done', 'Terminée'), ('failed', 'Échec')], default='pending', max_length=10)),
+                ('progress', models.PositiveSmallIntegerField(default=0, verbose_name='Progression (%)')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Tentatives')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Exécuter après')),
+                ('last_error', models.TextField(blank=True, verbose_name='Dernière erreur')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Tâche de fond',
+                'verbose_name_plural': 'Tâches de fond',
+                'ordering': ('id',),
+                'indexes': [models.Index(fields=['status', 'run_after'], name='website_bac_status_0b34ec_idx')],
+            },
+        ),
+        migrations.RunPython(mark_existing_ready, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0013_rendition_manifests'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gallerymedia',
+            index=models.Index(fields=['media_type', 'created'], name='website_gal_media_t_200592_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gallerymedia',
+            index=models.Index(fields=['created'], name='website_gal_created_54b28a_idx'),
+        ),
+    ]
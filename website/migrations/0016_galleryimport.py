@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0015_gallerymedia_size_checksum'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GalleryImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('archive_name', models.CharField(blank=True, max_length=255, verbose_name='Archive')),
+                ('status', models.CharField(choices=[('running', 'En cours'), ('done', 'Terminé'), ('failed', 'Échec')], default='running', max_length=10)),
+                ('total', models.PositiveIntegerField(default=0, verbose_name="Fichiers dans l'archive")),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='Traités')),
+                ('created', models.PositiveIntegerField(default=0, verbose_name='Ajoutés')),
+                ('skipped', models.PositiveIntegerField(default=0, verbose_name='Ignorés')),
+                ('failed', models.PositiveIntegerField(default=0, verbose_name='En échec')),
+                ('error', models.TextField(blank=True, verbose_name='Erreur')),
+                ('started', models.DateTimeField(auto_now_add=True, verbose_name='Début')),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='Fin')),
+                ('collection', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='imports', to='website.gallerycollection')),
+            ],
+            options={
+                'verbose_name': 'Import ZIP',
+                'verbose_name_plural': 'Imports ZIP',
+                'ordering': ('-id',),
+            },
+        ),
+    ]
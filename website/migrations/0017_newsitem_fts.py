@@ -0,0 +1,46 @@
+from django.db import OperationalError, migrations
+from django.utils.html import strip_tags
+
+# DDL figée ici: la migration ne doit pas suivre les évolutions de website/search.py
+FTS_TABLE = 'website_newsitem_fts'
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, content, location, tokenize = 'unicode61 remove_diacritics 2')"
+)
+
+
+def create_fts(apps, schema_editor):
+    # Table virtuelle FTS5 propre à SQLite: les autres moteurs gardent la recherche icontains
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    NewsItem = apps.get_model('website', 'NewsItem')
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute(CREATE_SQL)
+        except OperationalError:
+            # SQLite compilé sans FTS5
+            return
+        # Contenu HTML: seul le texte est indexé
+        for pk, title, content, location in NewsItem.objects.values_list('pk', 'title', 'content', 'location'):
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, content, location) VALUES (%s, %s, %s, %s)",
+                [pk, title or '', strip_tags(content or ''), location or ''],
+            )
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0016_galleryimport'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
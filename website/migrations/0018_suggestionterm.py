@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_suggestions(apps, schema_editor):
+    from website.suggestions import category_terms, item_terms, make_terms
+    NewsItem = apps.get_model('website', 'NewsItem')
+    Category = apps.get_model('website', 'Category')
+    SuggestionTerm = apps.get_model('website', 'SuggestionTerm')
+    rows = []
+    for item in NewsItem.objects.filter(status='published'):
+        rows += make_terms(SuggestionTerm, item_terms(item), news_item=item)
+    for category in Category.objects.all():
+        rows += make_terms(SuggestionTerm, category_terms(category), category=category)
+    SuggestionTerm.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0017_newsitem_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SuggestionTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('title', 'Publication'), ('category', 'Catégorie'), ('location', 'Lieu')], max_length=10)),
+                ('rank', models.PositiveSmallIntegerField(default=0)),
+                ('label', models.CharField(max_length=200)),
+                ('key', models.CharField(max_length=200)),
+                ('url', models.CharField(max_length=255)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='website.category')),
+                ('news_item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='website.newsitem')),
+            ],
+            options={
+                'verbose_name': 'Suggestion de recherche',
+                'verbose_name_plural': 'Suggestions de recherche',
+                'indexes': [models.Index(fields=['key'], name='website_sug_key_9c4044_idx')],
+            },
+        ),
+        migrations.RunPython(fill_suggestions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0018_suggestionterm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsitem',
+            name='article_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='newsitem',
+            name='read_time',
+            field=models.PositiveSmallIntegerField(default=1, editable=False, verbose_name='Temps de lecture (min)'),
+        ),
+        migrations.AddField(
+            model_name='newsitem',
+            name='toc',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Sommaire'),
+        ),
+    ]
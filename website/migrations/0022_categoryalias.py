@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_aliases(apps, schema_editor):
+    from website.slugs import category_alias_keys
+    Category = apps.get_model('website', 'Category')
+    CategoryAlias = apps.get_model('website', 'CategoryAlias')
+    rows = []
+    for category in Category.objects.order_by('pk'):
+        rows += [CategoryAlias(alias=key, category=category) for key in category_alias_keys(category.name, category.slug)]
+    # En cas de noms en double, la catégorie la plus ancienne garde l'alias
+    CategoryAlias.objects.bulk_create(rows, batch_size=500, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0021_outboxemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=200, unique=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='website.category')),
+            ],
+            options={
+                'verbose_name': 'Alias de catégorie',
+                'verbose_name_plural': 'Alias de catégorie',
+            },
+        ),
+        migrations.RunPython(fill_aliases, migrations.RunPython.noop),
+    ]
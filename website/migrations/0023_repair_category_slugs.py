@@ -0,0 +1,22 @@
+from django.db import migrations
+from django.db.models import Q
+
+
+def repair_category_slugs(apps, schema_editor):
+    # Réparation des slugs manquants, auparavant faite pendant les GET de posts_list
+    from website.slugs import allocate
+    Category = apps.get_model('website', 'Category')
+    for category in Category.objects.filter(Q(slug__isnull=True) | Q(slug='')).exclude(name='').order_by('pk'):
+        category.slug = allocate(Category, category.name, exclude_pk=category.pk)
+        category.save(update_fields=['slug'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0022_categoryalias'),
+    ]
+
+    operations = [
+        migrations.RunPython(repair_category_slugs, migrations.RunPython.noop),
+    ]
@@ -1,15 +1,14 @@
 from django.db import models
 import os
-from django.utils.text import slugify
 from django.urls import reverse
 from django.utils import timezone
 from io import BytesIO
 from PIL import Image
 from django.core.files.base import ContentFile
 import mimetypes
-from django.conf import settings
-from pathlib import Path
-import shutil
+from . import slugs, viewcache
+from .articles import render_article
+from .renditions import VARIANT_WIDTHS, GALLERY_WIDTHS, GALLERY_THUMB_WIDTH, GALLERY_DISPLAY_WIDTH, build_variants, cached_srcset, manifest_formats, rendition_url, variant_name
 
 
 class Category(models.Model):
@@ -23,17 +22,57 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Nom et slug chargés: conservés comme alias s'ils changent
+        instance._loaded_name = instance.__dict__.get('name')
+        instance._loaded_slug = instance.__dict__.get('slug')
+        return instance
+
     def save(self, *args, **kwargs):
         # Génère un slug à partir du nom si absent
         if not self.slug and self.name:
-            base = slugify(self.name)[:110]
-            candidate = base
-            i = 1
-            while Category.objects.filter(slug=candidate).exclude(pk=self.pk).exists():
-                candidate = f"{base}-{i}"[:120]
-                i += 1
-            self.slug = candidate
-        super().save(*args, **kwargs)
+            slugs.save_unique(self, self.name, super().save, *args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+        self.sync_aliases(getattr(self, '_loaded_name', None), getattr(self, '_loaded_slug', None))
+        self._loaded_name = self.name
+        self._loaded_slug = self.slug
+
+    def sync_aliases(self, previous_name=None, previous_slug=None):
+        """Tient à jour les alias (nom, nom slugifié, anciens noms et slugs) menant à cette catégorie.
+
+        Les clés du nom et du slug actuels sont reprises aux catégories qui ne les portent plus
+        (alias périmés); les anciennes ne sont ajoutées que si aucune autre catégorie ne les utilise.
+        """
+        current = slugs.category_alias_keys(self.name, self.slug)
+        previous = slugs.category_alias_keys(previous_name, previous_slug) - current
+        stale = [
+            alias.pk
+            for alias in CategoryAlias.objects.filter(alias__in=current).exclude(category=self).select_related('category')
+            if alias.alias not in slugs.category_alias_keys(alias.category.name, alias.category.slug)
+        ]
+        if stale:
+            CategoryAlias.objects.filter(pk__in=stale).update(category=self)
+        CategoryAlias.objects.bulk_create(
+            [CategoryAlias(alias=key, category=self) for key in current | previous],
+            ignore_conflicts=True,
+        )
+
+
+class CategoryAlias(models.Model):
+    """Ancien nom ou slug d'une catégorie: les liens ?cat= périmés y sont résolus en une
+    lecture d'index puis redirigés (301) vers le slug actuel."""
+    alias = models.CharField(max_length=200, unique=True)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='aliases')
+
+    class Meta:
+        verbose_name = 'Alias de catégorie'
+        verbose_name_plural = 'Alias de catégorie'
+
+    def __str__(self):
+        return f"{self.alias} → {self.category}"
 
 
 class NewsItem(models.Model):
@@ -58,6 +97,22 @@ class NewsItem(models.Model):
     image = models.ImageField(upload_to='news/', blank=True, null=True)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft')
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
+    # Champs écrits par le worker de build_renditions (jamais par une sauvegarde sans nouvelle image)
+    WORKER_FIELDS = ('image', 'rendition_status', 'image_renditions')
+    RENDITION_STATUS_CHOICES = (
+        ('none', 'Aucune image'),
+        ('pending', 'En attente'),
+        ('processing', 'En cours'),
+        ('ready', 'Prête'),
+        ('failed', 'Échec'),
+    )
+    rendition_status = models.CharField("Variantes d'image", max_length=12, choices=RENDITION_STATUS_CHOICES, default='none', editable=False)
+    # Manifeste des variantes de la couverture: {'width': W, 'height': H, 'widths': [800, ...]}
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
+    # Rendu précalculé du contenu (voir website/articles.py), mis à jour quand le contenu change
+    article_html = models.TextField(blank=True, editable=False)
+    toc = models.JSONField("Sommaire", default=list, blank=True, editable=False)
+    read_time = models.PositiveSmallIntegerField("Temps de lecture (min)", default=1, editable=False)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
@@ -70,14 +125,6 @@ class NewsItem(models.Model):
         return f"[{self.get_type_display()}] {self.title}"
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base_slug = slugify(self.title)[:200]
-            slug_candidate = base_slug
-            i = 1
-            while NewsItem.objects.filter(slug=slug_candidate).exclude(pk=self.pk).exists():
-                slug_candidate = f"{base_slug}-{i}"[:220]
-                i += 1
-            self.slug = slug_candidate
         # Clean event date if not an event
         if self.type != 'event':
             self.date_event = None
@@ -92,74 +139,109 @@ class NewsItem(models.Model):
             # Si le nouveau champ est renseigné, refléter vers l'ancien pour compatibilité
             if self.event_start:
                 self.date_event = self.event_start
-        super().save(*args, **kwargs)
-
-        # Post-save image optimization (only if image newly set or updated)
-        if self.image and hasattr(self.image, 'path'):
-            try:
-                img_path = self.image.path
-                with Image.open(img_path) as im:
-                    im_format = im.format
-                    # Largeur max augmentée pour meilleure netteté sur écrans haute densité et sections plein-largeur
-                    max_width = 3200
-                    if im.width > max_width:
-                        ratio = max_width / float(im.width)
-                        new_size = (max_width, int(im.height * ratio))
-                        im = im.resize(new_size, Image.LANCZOS)
-                    # Convert to RGB if JPEG candidate
-                    save_format = 'JPEG'
-                    # Légère hausse de la qualité JPEG pour réduire l'effet de flou/compression
-                    save_kwargs = {'quality': 85, 'optimize': True, 'progressive': True}
-                    if im_format and im_format.upper() in ('PNG', 'WEBP'):
-                        # Conserver PNG si transparence détectée
-                        if im.mode in ('RGBA', 'LA') or (im.mode == 'P' and 'transparency' in im.info):
-                            save_format = im_format.upper()
-                            if save_format == 'PNG':
-                                save_kwargs = {'optimize': True}
-                        else:
-                            if im.mode != 'RGB':
-                                im = im.convert('RGB')
+        # L'optimisation de l'image est confiée au worker (manage.py run_jobs)
+        image_changed = bool(self.image) and self.image.name != getattr(self, '_loaded_image_name', None)
+        if image_changed:
+            self.rendition_status = 'pending'
+            self.image_renditions = {}
+        elif not self.image:
+            self.rendition_status = 'none'
+            self.image_renditions = {}
+        content_loaded = 'content' not in self.get_deferred_fields()
+        if content_loaded and (self._state.adding or self.content != getattr(self, '_loaded_content', None)):
+            self.render_article()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'content' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'article_html', 'toc', 'read_time'}
+        if self.image and not image_changed and not self._state.adding:
+            # Image inchangée: le worker a pu réécrire image, rendition_status et
+            # image_renditions depuis le chargement; ne pas les écraser avec une copie périmée
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                deferred = self.get_deferred_fields()
+                update_fields = [f.name for f in self._meta.concrete_fields if not f.primary_key and f.attname not in deferred]
+            kwargs['update_fields'] = [f for f in update_fields if f not in self.WORKER_FIELDS]
+        if not self.slug:
+            slugs.save_unique(self, self.title, super().save, *args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+        self._loaded_image_name = self.image.name if self.image else None
+        self._loaded_content = self.content
+        if image_changed:
+            from .jobs import enqueue
+            enqueue('newsitem.renditions', {'pk': self.pk}, unique=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Mémoriser l'image chargée pour ne relancer l'optimisation que si elle change
+        image = instance.__dict__.get('image')
+        instance._loaded_image_name = getattr(image, 'name', image) or None
+        instance._loaded_content = instance.__dict__.get('content')
+        return instance
+
+    def render_article(self):
+        """Recalcule article_html, toc et read_time à partir du contenu (sans enregistrer)."""
+        self.article_html, self.toc, self.read_time = render_article(self.content)
+
+    def build_renditions(self, progress=None):
+        """Optimise l'image de couverture (max 3200px) puis génère les variantes srcset.
+        Exécuté par le worker de tâches; n'appelle pas save() pour ne pas ré-enfiler de tâche.
+        """
+        if not self.image or not hasattr(self.image, 'path'):
+            NewsItem.objects.filter(pk=self.pk).update(rendition_status='none')
+            return
+        NewsItem.objects.filter(pk=self.pk).update(rendition_status='processing')
+        try:
+            img_path = self.image.path
+            with Image.open(img_path) as im:
+                im_format = im.format
+                # Largeur max augmentée pour meilleure netteté sur écrans haute densité et sections plein-largeur
+                max_width = 3200
+                if im.width > max_width:
+                    ratio = max_width / float(im.width)
+                    new_size = (max_width, int(im.height * ratio))
+                    im = im.resize(new_size, Image.LANCZOS)
+                # Convert to RGB if JPEG candidate
+                save_format = 'JPEG'
+                # Légère hausse de la qualité JPEG pour réduire l'effet de flou/compression
+                save_kwargs = {'quality': 85, 'optimize': True, 'progressive': True}
+                if im_format and im_format.upper() in ('PNG', 'WEBP'):
+                    # Conserver PNG si transparence détectée
+                    if im.mode in ('RGBA', 'LA') or (im.mode == 'P' and 'transparency' in im.info):
+                        save_format = im_format.upper()
+                        if save_format == 'PNG':
+                            save_kwargs = {'optimize': True}
                     else:
                         if im.mode != 'RGB':
                             im = im.convert('RGB')
-                    buffer = BytesIO()
-                    im.save(buffer, save_format, **save_kwargs)
-                    file_basename = self.image.name.rsplit('.', 1)[0]
-                    new_ext = save_format.lower()
-                    new_name = f"{file_basename}.{new_ext}"
-                    self.image.save(new_name, ContentFile(buffer.getvalue()), save=False)
-                    super().save(update_fields=['image'])
-
-                    # Génération de variantes responsives (srcset) si image suffisamment large
-                    try:
-                        # Générer davantage de variantes pour les écrans rétina / grands écrans
-                        variant_sizes = [800, 1200, 1600, 1920, 2560, 3200]
-                        dir_name, base_filename = os.path.split(self.image.path)
-                        root_no_ext = os.path.splitext(base_filename)[0]
-                        # Recharger l'image optimisée (taille potentiellement modifiée)
-                        with Image.open(self.image.path) as master:
-                            for w in variant_sizes:
-                                if master.width <= w:  # inutile d'upscaler
-                                    continue
-                                ratio_v = w / float(master.width)
-                                target_size = (w, int(master.height * ratio_v))
-                                variant = master.resize(target_size, Image.LANCZOS)
-                                if variant.mode != 'RGB':
-                                    variant = variant.convert('RGB')
-                                v_buffer = BytesIO()
-                                variant.save(v_buffer, 'JPEG', quality=78, optimize=True, progressive=True)
-                                variant_name = f"{root_no_ext}_w{w}.jpg"
-                                variant_path = os.path.join(dir_name, variant_name)
-                                # Écrire seulement si non existant ou plus ancien (simple heuristique)
-                                if not os.path.exists(variant_path):
-                                    with open(variant_path, 'wb') as f_out:
-                                        f_out.write(v_buffer.getvalue())
-                    except Exception:
-                        # Ne doit pas casser la sauvegarde principale
-                        pass
-            except Exception:
-                # Silencieux : ne pas interrompre la sauvegarde si optimisation échoue
-                pass
+                else:
+                    if im.mode != 'RGB':
+                        im = im.convert('RGB')
+                buffer = BytesIO()
+                im.save(buffer, save_format, **save_kwargs)
+            # Nom de base seul: upload_to ('news/') est réappliqué par FieldFile.save
+            original_name = self.image.name
+            file_basename = os.path.basename(original_name).rsplit('.', 1)[0]
+            new_ext = save_format.lower()
+            new_name = f"{file_basename}.{new_ext}"
+            self.image.save(new_name, ContentFile(buffer.getvalue()), save=False)
+            NewsItem.objects.filter(pk=self.pk).update(image=self.image.name)
+            # L'original est remplacé: le supprimer pour ne pas laisser une copie par tentative
+            if original_name != self.image.name:
+                self.image.storage.delete(original_name)
+            self._loaded_image_name = self.image.name
+            if progress:
+                progress(50)
+            # Génération de variantes responsives (srcset) si image suffisamment large
+            manifest = build_variants(self.image.path, VARIANT_WIDTHS)
+        except Exception:
+            NewsItem.objects.filter(pk=self.pk).update(rendition_status='failed')
+            raise
+        self.rendition_status = 'ready'
+        self.image_renditions = manifest
+        NewsItem.objects.filter(pk=self.pk).update(rendition_status='ready', image_renditions=manifest)
+        viewcache.bump('news')
 
     def get_absolute_url(self):
         return reverse('website:post_detail', args=[self.slug])
@@ -230,6 +312,8 @@ class NewsMedia(models.Model):
     media_type = models.CharField(max_length=10, choices=MEDIA_CHOICES, default='file')
     caption = models.CharField(max_length=200, blank=True)
     order = models.PositiveIntegerField(default=0, help_text="Ordre d'affichage (0 en premier)")
+    # Manifeste des variantes srcset (images), rempli par le worker de tâches
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
     created = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -260,7 +344,29 @@ class NewsMedia(models.Model):
                     self.media_type = 'video'
                 else:
                     self.media_type = 'file'
+        file_changed = bool(self.file) and self.file.name != getattr(self, '_loaded_file_name', None)
+        if file_changed:
+            self.renditions = {}
         super().save(*args, **kwargs)
+        self._loaded_file_name = self.file.name if self.file else None
+        if file_changed and self.media_type == 'image':
+            from .jobs import enqueue
+            enqueue('newsmedia.renditions', {'pk': self.pk}, unique=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        file = instance.__dict__.get('file')
+        instance._loaded_file_name = getattr(file, 'name', file) or None
+        return instance
+
+    def build_renditions(self):
+        if self.media_type != 'image' or not self.file:
+            return
+        manifest = build_variants(self.file.path, VARIANT_WIDTHS)
+        self.renditions = manifest
+        NewsMedia.objects.filter(pk=self.pk).update(renditions=manifest)
+        viewcache.bump('news')
 
 
 class Center(models.Model):
@@ -301,6 +407,39 @@ class ContactMessage(models.Model):
         verbose_name_plural = 'Messages de contact'
 
 
+class OutboxEmail(models.Model):
+    """Email en attente d'envoi, expédié hors requête par `manage.py send_outbox`."""
+    STATUS_CHOICES = (
+        ('pending', 'En attente'),
+        ('sending', 'En cours'),
+        ('sent', 'Envoyé'),
+        ('failed', 'Échec'),
+    )
+    subject = models.CharField("Objet", max_length=255)
+    body = models.TextField("Texte")
+    html_body = models.TextField("HTML", blank=True)
+    from_email = models.CharField("Expéditeur", max_length=255, blank=True)
+    to = models.JSONField("Destinataires", default=list)
+    cc = models.JSONField("Copie", default=list, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField("Tentatives", default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField("Envoyer après", default=timezone.now)
+    last_error = models.TextField("Dernière erreur", blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+    sent_at = models.DateTimeField("Envoyé le", null=True, blank=True)
+
+    class Meta:
+        ordering = ('id',)
+        indexes = [models.Index(fields=['status', 'run_after'])]
+        verbose_name = "Email sortant"
+        verbose_name_plural = "Emails sortants"
+
+    def __str__(self):
+        return f"{self.subject} → {', '.join(self.to)} ({self.get_status_display()})"
+
+
 class ImpactMetrics(models.Model):
     """Métriques d'impact affichées sur les pages About et Donate.
     Utiliser des CharField pour permettre des formats comme "120+".
@@ -318,6 +457,31 @@ class ImpactMetrics(models.Model):
         return "Métriques d'impact"
 
 
+class SuggestionTerm(models.Model):
+    """Entrée de l'index des suggestions de recherche (voir website/suggestions.py)."""
+    KIND_CHOICES = (
+        ('title', 'Publication'),
+        ('category', 'Catégorie'),
+        ('location', 'Lieu'),
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    rank = models.PositiveSmallIntegerField(default=0)
+    label = models.CharField(max_length=200)
+    # Libellé replié (minuscules, sans accents) à partir d'un début de mot
+    key = models.CharField(max_length=200)
+    url = models.CharField(max_length=255)
+    news_item = models.ForeignKey(NewsItem, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+
+    class Meta:
+        indexes = [models.Index(fields=['key'])]
+        verbose_name = 'Suggestion de recherche'
+        verbose_name_plural = 'Suggestions de recherche'
+
+    def __str__(self):
+        return f"{self.label} ({self.key})"
+
+
 class GalleryCollection(models.Model):
     """Collection/Album Galerie importé depuis un dossier.
     Le nom de la collection sert de titre pour les médias affichés côté visiteur.
@@ -338,54 +502,15 @@ class GalleryCollection(models.Model):
     def save(self, *args, **kwargs):
         # Génère un slug unique
         if not self.slug and self.name:
-            base = slugify(self.name)[:200]
-            cand = base
-            i = 1
-            while GalleryCollection.objects.filter(slug=cand).exclude(pk=self.pk).exists():
-                cand = f"{base}-{i}"[:220]
-                i += 1
-            self.slug = cand
-        super().save(*args, **kwargs)
+            slugs.save_unique(self, self.name, super().save, *args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
 
-    def import_media(self):
-        """Importer tous les fichiers image/vidéo du dossier source vers MEDIA_ROOT/gallery/<slug>/ et créer les entrées GalleryMedia."""
-        images_ext = {'.jpg', '.jpeg', '.png', '.webp', '.gif'}
-        videos_ext = {'.mp4', '.webm', '.ogg', '.ogv', '.mov'}
-        base_src = Path(settings.MEDIA_ROOT) / 'gallery_sources'
-        src = (base_src / self.source_folder).resolve()
-        # Sécurité: src doit être sous base_src
-        try:
-            src.relative_to(base_src)
-        except Exception:
-            return 0
-        if not src.exists() or not src.is_dir():
-            return 0
-        dest_base = Path(settings.MEDIA_ROOT) / 'gallery' / self.slug
-        dest_base.mkdir(parents=True, exist_ok=True)
-        created_count = 0
-        for entry in sorted(src.iterdir()):
-            if not entry.is_file():
-                continue
-            ext = entry.suffix.lower()
-            media_type = 'image' if ext in images_ext else ('video' if ext in videos_ext else None)
-            if not media_type:
-                continue
-            # Copier vers destination
-            dest_path = dest_base / entry.name
-            try:
-                if not dest_path.exists():
-                    shutil.copy2(entry, dest_path)
-                rel_path = dest_path.relative_to(Path(settings.MEDIA_ROOT)).as_posix()
-                GalleryMedia.objects.get_or_create(
-                    collection=self,
-                    file=rel_path,
-                    defaults={'media_type': media_type}
-                )
-                created_count += 1
-            except Exception:
-                # Continuer même si un fichier pose problème
-                continue
-        return created_count
+    def import_media(self, workers=None):
+        """Importer tous les fichiers image/vidéo du dossier source vers MEDIA_ROOT/gallery/<slug>/ et créer les entrées GalleryMedia.
+        Retourne le nombre de médias créés (voir website.gallery_import pour le détail)."""
+        from .gallery_import import import_folder
+        return import_folder(self, workers=workers).created
 
 
 class GalleryMedia(models.Model):
@@ -396,12 +521,144 @@ class GalleryMedia(models.Model):
     collection = models.ForeignKey(GalleryCollection, on_delete=models.CASCADE, related_name='medias')
     file = models.FileField(upload_to='gallery/%Y/%m/', blank=False)
     media_type = models.CharField(max_length=10, choices=MEDIA_CHOICES)
+    # Manifeste des variantes générées: {'width': W, 'height': H, 'widths': [400, 800, ...]}
+    renditions = models.JSONField("Variantes", default=dict, blank=True, editable=False)
+    size = models.PositiveBigIntegerField("Taille (octets)", null=True, blank=True, editable=False)
+    checksum = models.CharField("SHA-256", max_length=64, blank=True, editable=False, db_index=True)
     created = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ('id',)
+        indexes = [
+            # Grille de la galerie: filtre par type puis tri par date, paginé en SQL
+            models.Index(fields=['media_type', 'created']),
+            models.Index(fields=['created']),
+        ]
         verbose_name = 'Média de galerie'
         verbose_name_plural = 'Médias de galerie'
 
     def __str__(self):
         return f"{self.get_media_type_display()} - {self.collection.name}"
+
+    def save(self, *args, **kwargs):
+        # Upload direct via l'inline admin: type non renseigné
+        if self.file and not self.media_type:
+            guessed, _ = mimetypes.guess_type(self.file.name)
+            self.media_type = 'video' if guessed and guessed.startswith('video/') else 'image'
+        super().save(*args, **kwargs)
+        if self.media_type == 'image' and not self.renditions:
+            self.build_renditions()
+
+    def build_renditions(self):
+        """Génère vignette + paliers srcset et enregistre le manifeste (sans repasser par save())."""
+        if self.media_type != 'image' or not self.file:
+            return False
+        try:
+            manifest = build_variants(self.file.path, GALLERY_WIDTHS)
+        except Exception:
+            # Fichier illisible ou stockage sans chemin disque: on garde l'original
+            return False
+        self.renditions = manifest
+        GalleryMedia.objects.filter(pk=self.pk).update(renditions=manifest)
+        viewcache.bump('gallery')
+        return True
+
+    def rendition_names(self):
+        manifest = self.renditions or {}
+        return [
+            variant_name(self.file.name, w, fmt)
+            for w in manifest.get('widths', [])
+            for fmt in manifest_formats(manifest)
+        ]
+
+    @property
+    def thumb_url(self):
+        """Vignette de grille; l'original si aucune variante n'existe."""
+        return rendition_url(self.file.name, self.renditions, GALLERY_THUMB_WIDTH)
+
+    @property
+    def display_url(self):
+        """Rendu "écran" pour la lightbox."""
+        return rendition_url(self.file.name, self.renditions, GALLERY_DISPLAY_WIDTH)
+
+    @property
+    def srcset(self):
+        manifest = self.renditions or {}
+        return cached_srcset(self.file.name, tuple(manifest.get('widths') or ()), self.file.url, manifest.get('width'))
+
+
+class GalleryImport(models.Model):
+    """Suivi d'un import d'archive ZIP dans une galerie (progression consultable dans l'admin)."""
+    STATUS_CHOICES = (
+        ('running', 'En cours'),
+        ('done', 'Terminé'),
+        ('failed', 'Échec'),
+    )
+    collection = models.ForeignKey(GalleryCollection, on_delete=models.CASCADE, related_name='imports')
+    archive_name = models.CharField("Archive", max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='running')
+    total = models.PositiveIntegerField("Fichiers dans l'archive", default=0)
+    processed = models.PositiveIntegerField("Traités", default=0)
+    created = models.PositiveIntegerField("Ajoutés", default=0)
+    skipped = models.PositiveIntegerField("Ignorés", default=0)
+    failed = models.PositiveIntegerField("En échec", default=0)
+    error = models.TextField("Erreur", blank=True)
+    started = models.DateTimeField("Début", auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+    finished = models.DateTimeField("Fin", null=True, blank=True)
+
+    class Meta:
+        ordering = ('-id',)
+        verbose_name = 'Import ZIP'
+        verbose_name_plural = 'Imports ZIP'
+
+    def __str__(self):
+        return f"{self.archive_name or 'ZIP'} → {self.collection.name} ({self.get_status_display()})"
+
+    @property
+    def percent(self):
+        return int(self.processed * 100 / self.total) if self.total else 0
+
+
+class ContentVersion(models.Model):
+    """Numéro de version d'un groupe de contenus, incrémenté à chaque modification
+    (clé d'invalidation du cache des pages publiques, voir website/viewcache.py)."""
+    name = models.CharField(max_length=32, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    changed = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Version de contenu'
+        verbose_name_plural = 'Versions de contenu'
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+class BackgroundJob(models.Model):
+    """Tâche de fond persistée en base, exécutée par `manage.py run_jobs` (aucun broker externe)."""
+    STATUS_CHOICES = (
+        ('pending', 'En attente'),
+        ('running', 'En cours'),
+        ('done', 'Terminée'),
+        ('failed', 'Échec'),
+    )
+    kind = models.CharField("Type", max_length=64, db_index=True)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    progress = models.PositiveSmallIntegerField("Progression (%)", default=0)
+    attempts = models.PositiveSmallIntegerField("Tentatives", default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField("Exécuter après", default=timezone.now)
+    last_error = models.TextField("Dernière erreur", blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ('id',)
+        indexes = [models.Index(fields=['status', 'run_after'])]
+        verbose_name = 'Tâche de fond'
+        verbose_name_plural = 'Tâches de fond'
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.get_status_display()})"
@@ -0,0 +1,105 @@
+"""File d'envoi des emails (outbox) adossée à la base de données.
+
+Les vues n'envoient plus rien elles-mêmes: `queue_email()` insère une ligne OutboxEmail et
+le worker `manage.py send_outbox` expédie les emails par lots sur une seule connexion SMTP
+réutilisée, avec reprise (backoff exponentiel) en cas d'échec.
+"""
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+# Délai de base entre deux tentatives (doublé à chaque échec)
+RETRY_BASE_SECONDS = 60
+# Un email resté "sending" plus longtemps est considéré abandonné (worker arrêté brutalement)
+STALE_AFTER = timezone.timedelta(minutes=15)
+
+
+def queue_email(subject, body, to, cc=None, html_body='', from_email=None):
+    """Ajoute un email à la file; retourne la ligne OutboxEmail créée."""
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        html_body=html_body,
+        from_email=from_email or getattr(settings, 'DEFAULT_FROM_EMAIL', 'no-reply@example.com'),
+        to=list(to),
+        cc=list(cc or []),
+    )
+
+
+def requeue_stale(now=None):
+    now = now or timezone.now()
+    return OutboxEmail.objects.filter(status='sending', updated__lt=now - STALE_AFTER).update(status='pending')
+
+
+def claim_batch(batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """Réserve jusqu'à `batch_size` emails à envoyer (mise à jour conditionnelle, sûre entre workers)."""
+    now = now or timezone.now()
+    ids = list(
+        OutboxEmail.objects.filter(status='pending', run_after__lte=now)
+        .order_by('id').values_list('id', flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+    OutboxEmail.objects.filter(id__in=ids, status='pending').update(status='sending', updated=now)
+    return list(OutboxEmail.objects.filter(id__in=ids, status='sending', updated=now))
+
+
+def _build(mail, connection):
+    message = EmailMultiAlternatives(
+        mail.subject, mail.body, mail.from_email or None, mail.to, cc=mail.cc, connection=connection,
+    )
+    if mail.html_body:
+        message.attach_alternative(mail.html_body, 'text/html')
+    return message
+
+
+def _failed(mail, error):
+    mail.attempts += 1
+    mail.last_error = error
+    if mail.attempts < mail.max_attempts:
+        mail.status = 'pending'
+        mail.run_after = timezone.now() + timezone.timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (mail.attempts - 1))
+    else:
+        mail.status = 'failed'
+    logger.warning("Email %s en échec (tentative %s/%s): %s", mail.pk, mail.attempts, mail.max_attempts, error)
+    mail.save(update_fields=['status', 'attempts', 'run_after', 'last_error', 'updated'])
+
+
+def send_batch(batch_size=DEFAULT_BATCH_SIZE, connection=None):
+    """Envoie un lot d'emails sur une seule connexion; retourne (envoyés, en échec)."""
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+    connection = connection or get_connection()
+    sent = failed = 0
+    try:
+        connection.open()
+    except Exception as exc:
+        # Serveur injoignable: tout le lot repart en file avec backoff
+        for mail in batch:
+            _failed(mail, f"Connexion impossible: {exc}")
+        return 0, len(batch)
+    try:
+        for mail in batch:
+            try:
+                _build(mail, connection).send()
+            except Exception as exc:
+                _failed(mail, str(exc) or exc.__class__.__name__)
+                failed += 1
+            else:
+                mail.attempts += 1
+                mail.status = 'sent'
+                mail.sent_at = timezone.now()
+                mail.last_error = ''
+                mail.save(update_fields=['status', 'attempts', 'sent_at', 'last_error', 'updated'])
+                sent += 1
+    finally:
+        connection.close()
+    return sent, failed
@@ -0,0 +1,134 @@
+"""Génération des variantes redimensionnées (srcset) des images.
+
+Pour chaque largeur inférieure à celle de l'original, une variante est écrite à côté de
+celui-ci dans chaque format disponible: ``<racine>_w<largeur>.jpg`` toujours, plus
+``<racine>_w<largeur>.webp`` et ``<racine>_w<largeur>.avif`` si le Pillow installé sait les
+encoder. Elles sont servies directement depuis MEDIA_URL.
+
+`build_variants` retourne un manifeste ``{'width', 'height', 'widths', 'formats'}`` (taille
+de l'original, largeurs et formats produits), enregistré en base avec l'image
+(NewsItem.image_renditions, NewsMedia.renditions, GalleryMedia.renditions): srcset et
+<picture> en sont déduits sans accès disque.
+"""
+import os
+from functools import lru_cache
+from io import BytesIO
+
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+# Variantes des images de couverture des publications (écrans rétina / pleine largeur)
+VARIANT_WIDTHS = [800, 1200, 1600, 1920, 2560, 3200]
+
+# Galerie: vignette de grille + paliers srcset; la lightbox utilise une variante "écran"
+GALLERY_THUMB_WIDTH = 400
+GALLERY_DISPLAY_WIDTH = 1600
+GALLERY_WIDTHS = [400, 800, 1200, 1600]
+
+VARIANT_QUALITY = 78
+
+
+# Formats produits pour chaque largeur: extension, format Pillow, options d'encodage, type MIME
+FORMAT_SPECS = {
+    'avif': ('avif', 'AVIF', {'quality': 55}, 'image/avif'),
+    'webp': ('webp', 'WEBP', {'quality': 75, 'method': 6}, 'image/webp'),
+    'jpeg': ('jpg', 'JPEG', {'quality': VARIANT_QUALITY, 'optimize': True, 'progressive': True}, 'image/jpeg'),
+}
+# Ordre des <source> dans <picture>: du plus compact au plus compatible
+PICTURE_FORMATS = ('avif', 'webp')
+
+
+def _pillow_supports(fmt: str) -> bool:
+    try:
+        if features.check(fmt.lower()):
+            return True
+    except Exception:
+        pass
+    # Plugin tiers (ex: pillow-avif-plugin) enregistré sans "feature" Pillow
+    Image.init()
+    return fmt.upper() in Image.SAVE
+
+
+def available_formats():
+    """Formats encodables par le Pillow installé (JPEG toujours, WebP/AVIF si supportés)."""
+    return ['jpeg'] + [fmt for fmt in ('webp', 'avif') if _pillow_supports(fmt)]
+
+
+def variant_name(name: str, width: int, fmt: str = 'jpeg') -> str:
+    """Nom relatif (storage) de la variante ``width`` pour le fichier ``name``."""
+    base, _ext = os.path.splitext(name)
+    return f"{base}_w{width}.{FORMAT_SPECS[fmt][0]}"
+
+
+def variant_url(name: str, width: int, fmt: str = 'jpeg') -> str:
+    return default_storage.url(variant_name(name, width, fmt))
+
+
+def build_variants(path, widths, formats=None):
+    """Crée les variantes manquantes de l'image ``path`` (chemin disque), pour chaque format.
+
+    Retourne un manifeste ``{'width': W, 'height': H, 'widths': [...], 'formats': [...]}``
+    décrivant l'original et les variantes disponibles (créées ou déjà présentes).
+    Aucune variante n'est produite au-delà de la largeur d'origine (pas d'upscale).
+    """
+    formats = list(formats or available_formats())
+    dir_name, base_filename = os.path.split(path)
+    root_no_ext = os.path.splitext(base_filename)[0]
+    available = []
+    with Image.open(path) as opened:
+        # Appliquer l'orientation EXIF (photos d'appareil) : les variantes perdent les métadonnées
+        master = ImageOps.exif_transpose(opened)
+        width, height = master.size
+        for w in sorted(widths):
+            if width <= w:  # inutile d'upscaler
+                continue
+            variant = None
+            for fmt in formats:
+                ext, pil_format, save_kwargs, _mime = FORMAT_SPECS[fmt]
+                variant_path = os.path.join(dir_name, f"{root_no_ext}_w{w}.{ext}")
+                if os.path.exists(variant_path):
+                    continue
+                if variant is None:
+                    ratio = w / float(width)
+                    variant = master.resize((w, int(height * ratio)), Image.LANCZOS)
+                    if variant.mode != 'RGB':
+                        variant = variant.convert('RGB')
+                buffer = BytesIO()
+                variant.save(buffer, pil_format, **save_kwargs)
+                with open(variant_path, 'wb') as f_out:
+                    f_out.write(buffer.getvalue())
+            available.append(w)
+    return {'width': width, 'height': height, 'widths': available, 'formats': formats}
+
+
+def pick_width(widths, target):
+    """Plus petite largeur disponible >= target, sinon la plus grande (ou None)."""
+    if not widths:
+        return None
+    larger = [w for w in widths if w >= target]
+    return min(larger) if larger else max(widths)
+
+
+def rendition_url(name: str, manifest, target: int) -> str:
+    """URL de la variante la plus adaptée à ``target`` px; l'original si aucune variante n'existe."""
+    w = pick_width((manifest or {}).get('widths'), target)
+    return variant_url(name, w) if w else default_storage.url(name)
+
+
+def manifest_formats(manifest):
+    # Manifestes antérieurs au WebP/AVIF: JPEG uniquement
+    return (manifest or {}).get('formats') or ['jpeg']
+
+
+def srcset_for(name: str, widths, original_url: str = '', original_width=None, fmt: str = 'jpeg') -> str:
+    """Chaîne srcset à partir des largeurs connues; pour le JPEG, l'original en dernier recours."""
+    parts = [f"{variant_url(name, w, fmt)} {w}w" for w in sorted(widths or [])]
+    if original_url:
+        parts.append(f"{original_url} {original_width}w" if original_width else original_url)
+    return ", ".join(parts)
+
+
+@lru_cache(maxsize=4096)
+def cached_srcset(name: str, widths: tuple, original_url: str = '', original_width=None, fmt: str = 'jpeg') -> str:
+    """`srcset_for` mémoïsé par processus: un nom de fichier donné a toujours les mêmes variantes."""
+    return srcset_for(name, widths, original_url, original_width, fmt)
@@ -0,0 +1,138 @@
+"""Recherche plein texte des publications (SQLite FTS5).
+
+La table virtuelle `website_newsitem_fts` (tokenizer unicode61, accents ignorés) est créée
+par la migration 0017 et tenue à jour par les signaux post_save / post_delete de NewsItem.
+Sur une base sans FTS5 (autre moteur, SQLite compilé sans l'extension), `search()` retombe
+sur l'ancienne recherche `icontains`.
+"""
+import re
+
+from django.db import connection
+from django.utils.html import escape, strip_tags
+from django.utils.safestring import mark_safe
+
+FTS_TABLE = 'website_newsitem_fts'
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, content, location, tokenize = 'unicode61 remove_diacritics 2')"
+)
+# Poids bm25 par colonne: titre > lieu > contenu
+RANK_SQL = f"bm25({FTS_TABLE}, 10.0, 1.0, 2.0)"
+
+# Marqueurs de surlignage insérés par snippet(), échappés puis convertis en <mark>
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+_available = set()
+
+
+def fts_available():
+    """Vrai si la table FTS5 existe sur la connexion courante (résultat positif mis en cache)."""
+    if connection.alias in _available:
+        return True
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        if cursor.fetchone() is None:
+            return False
+    _available.add(connection.alias)
+    return True
+
+
+def match_expression(query):
+    """Convertit la saisie utilisateur en expression MATCH sûre: chaque mot entre guillemets,
+    en préfixe (ex: "sant"* trouve santé), combinés par ET."""
+    terms = _TERM_RE.findall(query)
+    return ' '.join('"%s"*' % term.replace('"', '""') for term in terms)
+
+
+def _row(pk, title, content, location):
+    # Le contenu est du HTML: seul le texte est indexé (ni balises ni attributs dans les extraits)
+    return [pk, title or '', strip_tags(content or ''), location or '']
+
+
+def index_item(item):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [item.pk])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, content, location) VALUES (%s, %s, %s, %s)",
+            _row(item.pk, item.title, item.content, item.location),
+        )
+
+
+def remove_item(pk):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [pk])
+
+
+def rebuild_index():
+    """Réindexe toutes les publications; retourne le nombre de lignes indexées."""
+    from .models import NewsItem
+    rows = NewsItem.objects.order_by('pk').values_list('pk', 'title', 'content', 'location')
+    count = 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        for row in rows.iterator(chunk_size=500):
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, content, location) VALUES (%s, %s, %s, %s)",
+                _row(*row),
+            )
+            count += 1
+    return count
+
+
+def highlight(snippet):
+    """Échappe l'extrait puis remplace les marqueurs FTS par <mark>."""
+    html = escape(snippet).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+    return mark_safe(html)
+
+
+class FtsResults:
+    """Résultats classés par bm25, paginables par `Paginator` (COUNT + LIMIT/OFFSET en SQL).
+
+    Chaque tranche renvoie des tuples (id, extrait HTML) dans l'ordre de pertinence.
+    """
+
+    def __init__(self, query):
+        self.match = match_expression(query)
+        self._count = None
+
+    def _from(self):
+        return (
+            f"FROM {FTS_TABLE} JOIN website_newsitem n ON n.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND n.status = 'published'"
+        )
+
+    def count(self):
+        if self._count is None:
+            if not self.match:
+                self._count = 0
+            else:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"SELECT COUNT(*) {self._from()}", [self.match])
+                    self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        if not self.match:
+            return []
+        start = key.start or 0
+        stop = key.stop if key.stop is not None else self.count()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT n.id, snippet({FTS_TABLE}, -1, %s, %s, '…', 24) {self._from()} "
+                f"ORDER BY {RANK_SQL}, n.id DESC LIMIT %s OFFSET %s",
+                [_MARK_START, _MARK_END, self.match, max(0, stop - start), start],
+            )
+            return [(pk, highlight(snippet)) for pk, snippet in cursor.fetchall()]
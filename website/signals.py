@@ -1,35 +1,63 @@
 from django.contrib.auth.signals import user_login_failed, user_logged_in
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from django.utils import timezone
 
-FAIL_KEY = 'admin_login_fail_count'
-LOCK_UNTIL_KEY = 'admin_login_lock_until'
-FAIL_THRESHOLD = 3
-LOCK_MINUTES = 2
+from . import dashboard_metrics, login_attempts, search, suggestions, viewcache
+from .models import Category, Center, ContactMessage, GalleryCollection, GalleryMedia, ImpactMetrics, NewsItem, NewsMedia
 
 @receiver(user_login_failed)
 def login_failed(sender, credentials, request, **kwargs):  # type: ignore
     if request is None:
         return
-    # Si déjà verrouillé, ne pas incrémenter
-    lock_until = request.session.get(LOCK_UNTIL_KEY)
-    if lock_until:
-        try:
-            if timezone.now() < timezone.datetime.fromisoformat(lock_until):
-                return
-        except Exception:
-            request.session.pop(LOCK_UNTIL_KEY, None)
-    count = request.session.get(FAIL_KEY, 0) + 1
-    request.session[FAIL_KEY] = count
-    if count >= FAIL_THRESHOLD:
-        # Définir verrouillage
-        lock_time = timezone.now() + timezone.timedelta(minutes=LOCK_MINUTES)
-        request.session[LOCK_UNTIL_KEY] = lock_time.isoformat()
+    username = (credentials or {}).get('username')
+    login_attempts.record_failure(request, username)
+    # Le gabarit de connexion réaffiché doit refléter cet échec
+    login_attempts.annotate(request, username)
 
 @receiver(user_logged_in)
 def login_success(sender, request, user, **kwargs):  # type: ignore
     if request is None:
         return
-    for key in (FAIL_KEY, LOCK_UNTIL_KEY):
-        if key in request.session:
-            request.session.pop(key, None)
\ No newline at end of file
+    login_attempts.reset(request, user.get_username())
+
+@receiver(post_save, sender=NewsItem)
+def newsitem_index(sender, instance, raw=False, **kwargs):  # type: ignore
+    if raw:
+        return
+    search.index_item(instance)
+    suggestions.refresh_item(instance)
+
+
+@receiver(post_delete, sender=NewsItem)
+def newsitem_unindex(sender, instance, **kwargs):  # type: ignore
+    search.remove_item(instance.pk)
+    suggestions.bump_generation()
+
+
+@receiver(post_save, sender=Category)
+def category_suggestions(sender, instance, raw=False, **kwargs):  # type: ignore
+    if raw:
+        return
+    suggestions.refresh_category(instance)
+
+
+@receiver(post_delete, sender=Category)
+def category_suggestions_removed(sender, instance, **kwargs):  # type: ignore
+    suggestions.bump_generation()
+
+
+def content_changed(sender, raw=False, **kwargs):  # type: ignore
+    # Invalide le cache des pages publiques qui affichent ce type de contenu
+    if raw:
+        return
+    viewcache.bump(viewcache.MODEL_GROUPS[sender.__name__])
+
+
+for _model in (NewsItem, NewsMedia, Category, GalleryCollection, GalleryMedia, Center, ImpactMetrics):
+    post_save.connect(content_changed, sender=_model, dispatch_uid=f'viewcache-save-{_model.__name__}')
+    post_delete.connect(content_changed, sender=_model, dispatch_uid=f'viewcache-delete-{_model.__name__}')
+
+
+for _model in (NewsItem, ContactMessage, Center):
+    post_save.connect(dashboard_metrics.invalidate, sender=_model, dispatch_uid=f'dashboard-save-{_model.__name__}')
+    post_delete.connect(dashboard_metrics.invalidate, sender=_model, dispatch_uid=f'dashboard-delete-{_model.__name__}')
@@ -0,0 +1,71 @@
+"""Attribution de slugs uniques (Category, NewsItem, GalleryCollection).
+
+Les slugs déjà pris de la forme `base` / `base-N` sont lus en une seule requête
+d'intervalle sur l'index unique du champ (slug >= base AND slug < base + U+FFFF), puis le
+premier suffixe libre est choisi en mémoire: le coût ne dépend plus du nombre de collisions.
+Si un enregistrement concurrent prend le même slug entre la lecture et l'écriture,
+l'IntegrityError est interceptée et un nouveau slug est attribué.
+"""
+import re
+
+from django.db import IntegrityError, transaction
+from django.utils.text import slugify
+
+# Place réservée au suffixe "-N" dans la longueur maximale du champ
+SUFFIX_RESERVE = 10
+MAX_ATTEMPTS = 5
+
+
+def _field_max_length(model, field):
+    return model._meta.get_field(field).max_length
+
+
+def allocate(model, text, exclude_pk=None, field='slug'):
+    """Premier slug libre pour `text`: la base seule, sinon base-N avec le plus petit N libre
+    (même résultat que l'ancienne boucle de exists(), en une requête)."""
+    max_length = _field_max_length(model, field)
+    base = slugify(text or '')[:max_length - SUFFIX_RESERVE].strip('-') or model._meta.model_name
+    taken = model._default_manager.filter(**{f'{field}__gte': base, f'{field}__lt': base + '\uffff'})
+    if exclude_pk is not None:
+        taken = taken.exclude(pk=exclude_pk)
+    # Suffixes canoniques seulement: base-0 ou base-01 ne bloquent ni base ni base-1
+    pattern = re.compile(rf'^{re.escape(base)}(?:-([1-9]\d*))?$')
+    used = set()
+    for slug in taken.values_list(field, flat=True):
+        match = pattern.match(slug)
+        if match:
+            # None: la base seule est prise
+            used.add(int(match.group(1)) if match.group(1) else None)
+    if None not in used:
+        return base
+    suffix = 1
+    while suffix in used:
+        suffix += 1
+    return f"{base}-{suffix}"
+
+
+def save_unique(instance, text, save, *args, field='slug', **kwargs):
+    """Attribue un slug libre à `instance` puis appelle `save(*args, **kwargs)`
+    (le `save` du modèle parent), en recommençant si le slug a été pris entre-temps."""
+    model = type(instance)
+    for attempt in range(MAX_ATTEMPTS):
+        setattr(instance, field, allocate(model, text, exclude_pk=instance.pk, field=field))
+        try:
+            with transaction.atomic():
+                return save(*args, **kwargs)
+        except IntegrityError:
+            slug_taken = model._default_manager.filter(**{field: getattr(instance, field)}).exclude(pk=instance.pk).exists()
+            if not slug_taken or attempt == MAX_ATTEMPTS - 1:
+                raise
+
+
+def alias_key(value):
+    """Forme normalisée d'un ancien paramètre ?cat= (nom ou slug), clé de CategoryAlias."""
+    return (value or '').strip().lower()[:200]
+
+
+def category_alias_keys(name, slug=None):
+    """Clés sous lesquelles une catégorie doit rester joignable: nom, nom slugifié, slug."""
+    keys = {alias_key(name), alias_key(slugify(name or '')), alias_key(slug)}
+    keys.discard('')
+    return keys
@@ -0,0 +1,118 @@
+"""Suggestions de recherche (saisie semi-automatique) à partir d'un index de préfixes.
+
+Chaque titre de publication, catégorie et lieu est enregistré dans SuggestionTerm sous une
+forme repliée (minuscules, sans accents), une ligne par début de mot: « Journée santé » est
+trouvé par « jour » comme par « sante ». La recherche d'un préfixe est une requête
+d'intervalle (key >= p AND key < p + U+FFFF) qui exploite l'index B-tree de `key`.
+Les réponses des préfixes demandés sont mises en cache avec une durée de vie; toute mise
+à jour de l'index change la génération et périme les entrées existantes.
+"""
+import re
+import unicodedata
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.urls import reverse
+
+MIN_PREFIX = 2
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+# Nombre de débuts de mot indexés par libellé
+MAX_WORDS = 8
+CACHE_TTL = 300
+GENERATION_KEY = 'suggest:gen'
+# Ordre d'affichage: publications, puis catégories, puis lieux
+KIND_RANK = {'title': 0, 'category': 1, 'location': 2}
+
+_NON_WORD_RE = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def fold(text):
+    """Forme repliée d'un texte: minuscules, sans accents, mots séparés par une espace."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_WORD_RE.sub(' ', stripped.lower()).strip()
+
+
+def keys_for(label):
+    """Clés d'index d'un libellé: le texte replié à partir de chacun de ses premiers mots."""
+    words = fold(label).split(' ')
+    return list(dict.fromkeys(' '.join(words[i:]) for i in range(min(len(words), MAX_WORDS)) if words[i]))
+
+
+def item_terms(item):
+    """Lignes (kind, label, key, url) d'une publication publiée: titre et lieu."""
+    if item.status != 'published':
+        return []
+    rows = []
+    if item.title and item.slug:
+        url = reverse('website:post_detail', args=[item.slug])
+        rows += [('title', item.title, key, url) for key in keys_for(item.title)]
+    if item.location:
+        url = reverse('website:search') + '?' + urlencode({'q': item.location})
+        rows += [('location', item.location, key, url) for key in keys_for(item.location)]
+    return rows
+
+
+def category_terms(category):
+    if not category.name or not category.slug:
+        return []
+    url = reverse('website:posts_list') + '?' + urlencode({'cat': category.slug})
+    return [('category', category.name, key, url) for key in keys_for(category.name)]
+
+
+def _key(*parts):
+    return ':'.join(str(p) for p in parts)
+
+
+def bump_generation():
+    """Périme toutes les réponses en cache (appelé après chaque mise à jour de l'index)."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, None)
+
+
+def make_terms(model, terms, **owner):
+    """Instances SuggestionTerm (non enregistrées); `model` peut être un modèle historique."""
+    return [
+        model(kind=kind, rank=KIND_RANK[kind], label=label[:200], key=key[:200], url=url, **owner)
+        for kind, label, key, url in terms
+    ]
+
+
+def refresh_item(item):
+    from .models import SuggestionTerm
+    SuggestionTerm.objects.filter(news_item=item).delete()
+    SuggestionTerm.objects.bulk_create(make_terms(SuggestionTerm, item_terms(item), news_item=item))
+    bump_generation()
+
+
+def refresh_category(category):
+    from .models import SuggestionTerm
+    SuggestionTerm.objects.filter(category=category).delete()
+    SuggestionTerm.objects.bulk_create(make_terms(SuggestionTerm, category_terms(category), category=category))
+    bump_generation()
+
+
+def suggest(prefix, limit=DEFAULT_LIMIT):
+    """Jusqu'à `limit` suggestions {'kind', 'label', 'url'} pour le préfixe saisi."""
+    from .models import SuggestionTerm
+    folded = fold(prefix)[:200]
+    if len(folded) < MIN_PREFIX:
+        return []
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    cache_key = _key('suggest', cache.get(GENERATION_KEY, 0), limit, folded)
+    results = cache.get(cache_key)
+    if results is not None:
+        return results
+    rows = (
+        SuggestionTerm.objects.filter(key__gte=folded, key__lt=folded + '\uffff')
+        .order_by('rank', 'label')
+        .values_list('kind', 'label', 'url')
+        # Un libellé peut correspondre par plusieurs mots, un lieu être partagé par plusieurs publications
+        .distinct()[:limit]
+    )
+    results = [{'kind': kind, 'label': label, 'url': url} for kind, label, url in rows]
+    cache.set(cache_key, results, CACHE_TTL)
+    return results
@@ -1,52 +1,88 @@
 from django import template
 from django.conf import settings
-from pathlib import Path
-import os
-from urllib.parse import urlparse
+from django.utils.html import format_html, format_html_join
+from website.renditions import FORMAT_SPECS, PICTURE_FORMATS, cached_srcset, manifest_formats
 
 register = template.Library()
 
-VARIANT_WIDTHS = [800, 1200, 1600, 1920, 2560, 3200]
+DEFAULT_SIZES = "(max-width: 575px) 100vw, (max-width: 991px) 50vw, 33vw"
 
-def _variant_name(original_name: str, width: int) -> str:
-    base, ext = os.path.splitext(original_name)
-    # Normaliser extension en .jpg pour variantes (générées en JPEG dans save())
-    return f"{base}_w{width}.jpg"
+# Champ fichier → attribut du modèle contenant le manifeste des variantes
+MANIFEST_ATTRS = {
+    'image': 'image_renditions',  # NewsItem (couverture)
+    'file': 'renditions',         # NewsMedia, GalleryMedia
+}
 
-@register.simple_tag
-def responsive_srcset(image_field):
-    """Retourne une chaîne srcset valide.
-    Accepte ImageFieldFile ou simple string (URL relative/absolue).
-    Si variantes absentes → seulement l'original.
-    """
-    if not image_field:
-        return ""
-    media_root = Path(settings.MEDIA_ROOT)
+
+def _resolve(image_field, manifest=None):
+    """(nom relatif, URL d'origine, manifeste) — manifeste vide si pas de variantes exploitables."""
     # Déterminer nom relatif et URL d'origine
     if hasattr(image_field, 'name') and hasattr(image_field, 'url'):
         rel_name = image_field.name
         original_url = image_field.url
+        instance = image_field.instance
+        # Variantes pas encore produites par le worker → servir l'original
+        if getattr(instance, 'rendition_status', 'ready') != 'ready':
+            return rel_name, original_url, {}
+        if manifest is None:
+            manifest = getattr(instance, MANIFEST_ATTRS.get(image_field.field.name, ''), None)
     else:
-        # image_field peut être une chaîne (ex: déjà it.image dans posts_list)
+        # image_field peut être une chaîne (ex: URL déjà résolue dans un dict de vue)
         original_url = str(image_field)
-        parsed = urlparse(original_url)
-        # Si c'est absolu et ne pointe pas sur MEDIA_URL -> retourner simplement l'URL
-        if parsed.scheme and settings.MEDIA_URL not in original_url:
-            return original_url
-        # Construire nom relatif probable
-        if settings.MEDIA_URL and original_url.startswith(settings.MEDIA_URL):
-            rel_name = original_url[len(settings.MEDIA_URL):]
-        else:
-            rel_name = original_url.lstrip('/')
-    parts = []
-    for w in VARIANT_WIDTHS:
-        variant_rel = _variant_name(rel_name, w)
-        variant_fs = media_root / variant_rel
-        if variant_fs.exists():
-            parts.append(f"{settings.MEDIA_URL}{variant_rel} {w}w")
-    parts.append(f"{original_url}")
-    return ", ".join(parts)
+        if not settings.MEDIA_URL or not original_url.startswith(settings.MEDIA_URL):
+            return None, original_url, {}
+        rel_name = original_url[len(settings.MEDIA_URL):]
+    return rel_name, original_url, manifest or {}
+
+
+@register.simple_tag
+def responsive_srcset(image_field, manifest=None):
+    """Retourne une chaîne srcset valide.
+    Accepte ImageFieldFile (manifeste lu sur l'instance) ou simple string (URL) + manifeste explicite.
+    Construit uniquement à partir du manifeste enregistré en base : aucun accès disque.
+    Si variantes absentes → seulement l'original.
+    """
+    if not image_field:
+        return ""
+    rel_name, original_url, manifest = _resolve(image_field, manifest)
+    widths = tuple(manifest.get('widths') or ())
+    if not widths:
+        return original_url
+    return cached_srcset(rel_name, widths, original_url, manifest.get('width'))
+
+
+@register.simple_tag
+def responsive_picture(image_field, alt='', sizes=DEFAULT_SIZES, img_class='', picture_class='d-block w-100 h-100',
+                       manifest=None, src=None, **attrs):
+    """Élément <picture>: une <source> AVIF/WebP par format disponible, puis <img> JPEG (srcset) en repli.
+    Les attributs supplémentaires sont recopiés sur <img> (data_full → data-full, loading, decoding...).
+    """
+    if not image_field:
+        return ""
+    rel_name, original_url, manifest = _resolve(image_field, manifest)
+    widths = tuple(manifest.get('widths') or ())
+    formats = manifest_formats(manifest)
+    sources = []
+    if widths:
+        sources = [
+            (FORMAT_SPECS[fmt][3], cached_srcset(rel_name, widths, fmt=fmt), sizes)
+            for fmt in PICTURE_FORMATS if fmt in formats
+        ]
+    img_attrs = [('src', src or original_url)]
+    if widths:
+        img_attrs += [('srcset', cached_srcset(rel_name, widths, original_url, manifest.get('width'))), ('sizes', sizes)]
+    img_attrs += [('alt', alt)]
+    if img_class:
+        img_attrs.append(('class', img_class))
+    img_attrs += [(key.replace('_', '-'), value) for key, value in attrs.items() if value is not None]
+    return format_html(
+        '<picture{}>{}<img {}></picture>',
+        format_html(' class="{}"', picture_class) if picture_class else '',
+        format_html_join('', '<source type="{}" srcset="{}" sizes="{}">', sources),
+        format_html_join(' ', '{}="{}"', img_attrs),
+    )
+
 
 @register.simple_tag
-def responsive_sizes(default="(max-width: 575px) 100vw, (max-width: 991px) 50vw, 33vw"):
+def responsive_sizes(default=DEFAULT_SIZES):
     return default
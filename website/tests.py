@@ -1,6 +1,35 @@
-from django.test import TestCase, Client
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from website.models import NewsItem, ContactMessage, Category
+from django.utils import timezone
+from PIL import Image
+from website import building_gallery, impact_metrics, jobs, outbox, slugs, viewcache
+from website.renditions import available_formats
+from website.zipstream import ZipEntry, archive_size, iter_zip
+from website.templatetags.responsive_images import responsive_picture, responsive_srcset
+from website.models import NewsItem, NewsMedia, Center, ImpactMetrics, OutboxEmail, ContactMessage, Category, CategoryAlias, GalleryCollection, GalleryMedia, GalleryImport, BackgroundJob
+
+
+def make_jpeg(width=1000, height=600):
+    buf = BytesIO()
+    Image.new('RGB', (width, height), (200, 40, 80)).save(buf, 'JPEG')
+    return buf.getvalue()
+
 
 class NewsItemModelTests(TestCase):
     def test_slug_auto_generation_and_uniqueness(self):
@@ -14,8 +43,70 @@ class NewsItemModelTests(TestCase):
         item = NewsItem.objects.create(title='Article', type='post', status='draft', date_event=None)
         self.assertIsNone(item.date_event)
 
+class SlugAllocationTests(TestCase):
+    def test_next_suffix_in_one_query(self):
+        GalleryCollection.objects.create(name='Octobre Rose')
+        for i in range(1, 30):
+            GalleryCollection.objects.create(name='Octobre Rose', slug=f'octobre-rose-{i}')
+        GalleryCollection.objects.create(name='Octobre Rose 2024')
+        with CaptureQueriesContext(connection) as ctx:
+            gallery = GalleryCollection.objects.create(name='Octobre Rose')
+        self.assertEqual(gallery.slug, 'octobre-rose-30')
+        self.assertEqual(len([q for q in ctx.captured_queries if q['sql'].startswith('SELECT')]), 1)
+
+    def test_zero_suffix_does_not_hide_free_base(self):
+        Category.objects.create(name='Santé', slug='sante-0')
+        Category.objects.create(name='Santé', slug='sante-01')
+        self.assertEqual(slugs.allocate(Category, 'Santé'), 'sante')
+        Category.objects.create(name='Santé')
+        self.assertEqual(slugs.allocate(Category, 'Santé'), 'sante-1')
+
+    def test_retries_when_slug_taken_concurrently(self):
+        Category.objects.create(name='Santé')
+        # Première lecture périmée (comme si un autre processus venait d'écrire)
+        with mock.patch.object(slugs, 'allocate', side_effect=['sante', 'sante-1']) as allocate:
+            category = Category.objects.create(name='Santé')
+        self.assertEqual(category.slug, 'sante-1')
+        self.assertEqual(allocate.call_count, 2)
+
+    def test_backfill_command(self):
+        Category.objects.create(name='Éducation')
+        NewsItem.objects.create(title='Kermesse', type='post', status='published')
+        Category.objects.bulk_create([Category(name='Éducation'), Category(name='Santé', slug='')])
+        NewsItem.objects.bulk_create([NewsItem(title='Kermesse', type='post', status='published', slug='')])
+        call_command('backfill_slugs', stdout=StringIO())
+        self.assertEqual(sorted(Category.objects.values_list('slug', flat=True)), ['education', 'education-1', 'sante'])
+        self.assertEqual(sorted(NewsItem.objects.values_list('slug', flat=True)), ['kermesse', 'kermesse-1'])
+
+
+class ArticleRenderingTests(TestCase):
+    def test_headings_anchored_once_at_save(self):
+        item = NewsItem.objects.create(
+            title='Rapport', type='post', status='published',
+            content='<h2>Nos <em>actions</em></h2><p>' + 'mot ' * 450 + '</p><h3>Bilan 2025</h3>',
+        )
+        self.assertEqual(item.toc, [
+            {'id': 'nos-actions', 'text': 'Nos actions', 'level': 2},
+            {'id': 'bilan-2025', 'text': 'Bilan 2025', 'level': 3},
+        ])
+        self.assertIn('<h2 id="nos-actions">Nos <em>actions</em></h2>', item.article_html)
+        self.assertEqual(item.read_time, 2)
+        resp = Client().get(reverse('website:post_detail', args=[item.slug]))
+        self.assertContains(resp, '<h3 id="bilan-2025">Bilan 2025</h3>', html=False)
+        self.assertEqual(resp.context['toc'], item.toc)
+
+    def test_plain_content_and_backfill(self):
+        item = NewsItem.objects.create(title='Brève', type='post', status='published', content='Ligne 1\nLigne 2')
+        self.assertEqual(item.article_html, '<p>Ligne 1<br>Ligne 2</p>')
+        NewsItem.objects.filter(pk=item.pk).update(article_html='', content='<h2>Titre</h2>')
+        call_command('render_articles', stdout=StringIO())
+        item.refresh_from_db()
+        self.assertEqual(item.toc, [{'id': 'titre', 'text': 'Titre', 'level': 2}])
+
+
 class HomeViewTests(TestCase):
     def setUp(self):
+        cache.clear()
         for i in range(5):
             NewsItem.objects.create(title=f'Post {i}', type='post', status='published')
         for i in range(4):
@@ -47,9 +138,711 @@ class ContactFormTests(TestCase):
         # Vérifie qu'un message de succès est présent
         messages = list(resp.context['messages'])
         self.assertTrue(any('succès' in m.message.lower() for m in messages))
+        # Rien n'est envoyé pendant la requête: l'accusé attend dans la file
+        self.assertEqual(mail.outbox, [])
+        queued = OutboxEmail.objects.get()
+        self.assertEqual(queued.to, ['alice@example.com'])
+
+        call_command('send_outbox', once=True, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].cc, ['tfeinsti@gmail.com'])
+        self.assertIn('Bonjour <strong>Alice</strong>', mail.outbox[0].alternatives[0][0])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'sent')
+
+
+class OutboxTests(TestCase):
+    def test_batch_reuses_one_connection_and_retries_failures(self):
+        for i in range(3):
+            outbox.queue_email(f'Sujet {i}', 'Texte', [f'dest{i}@example.com'])
+        connection = mock.MagicMock()
+        connection.send_messages.side_effect = [1, Exception('550 refusé'), 1]
+        sent, failed = outbox.send_batch(connection=connection)
+        self.assertEqual((sent, failed), (2, 1))
+        connection.open.assert_called_once()
+        connection.close.assert_called_once()
+        retry = OutboxEmail.objects.get(status='pending')
+        self.assertEqual((retry.subject, retry.attempts), ('Sujet 1', 1))
+        self.assertGreater(retry.run_after, timezone.now())
+        # Pas encore l'heure de la nouvelle tentative
+        self.assertEqual(outbox.send_batch(connection=connection), (0, 0))
+
+    def test_unreachable_server_requeues_whole_batch(self):
+        outbox.queue_email('Sujet', 'Texte', ['dest@example.com'])
+        connection = mock.MagicMock()
+        connection.open.side_effect = OSError('timeout')
+        self.assertEqual(outbox.send_batch(connection=connection), (0, 1))
+        self.assertEqual(OutboxEmail.objects.get().status, 'pending')
+
+class GalleryRenditionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.coll = GalleryCollection.objects.create(name='Octobre Rose')
+
+    def test_upload_generates_thumbnail_ladder(self):
+        gm = GalleryMedia.objects.create(
+            collection=self.coll,
+            file=SimpleUploadedFile('photo.jpg', make_jpeg(), content_type='image/jpeg'),
+        )
+        gm.refresh_from_db()
+        self.assertEqual(gm.media_type, 'image')
+        self.assertEqual(gm.renditions['widths'], [400, 800])
+        self.assertIn('_w400.jpg', gm.thumb_url)
+        self.assertIn('_w800.jpg', gm.display_url)
+
+    def test_picture_offers_modern_formats(self):
+        gm = GalleryMedia.objects.create(
+            collection=self.coll,
+            file=SimpleUploadedFile('photo.jpg', make_jpeg(), content_type='image/jpeg'),
+        )
+        html = responsive_picture(gm.file, alt='Photo', src=gm.thumb_url, loading='lazy')
+        self.assertTrue(html.startswith('<picture'))
+        self.assertIn('src="%s"' % gm.thumb_url, html)
+        self.assertIn('loading="lazy"', html)
+        if 'webp' in available_formats():
+            self.assertIn('<source type="image/webp"', html)
+            self.assertIn('_w400.webp 400w', html)
+        if 'avif' in available_formats():
+            self.assertLess(html.index('image/avif'), html.index('image/webp'))
+
+    def test_gallery_grid_serves_thumbnails(self):
+        GalleryMedia.objects.create(
+            collection=self.coll,
+            file=SimpleUploadedFile('photo.jpg', make_jpeg(), content_type='image/jpeg'),
+        )
+        resp = Client().get(reverse('website:gallery'))
+        self.assertEqual(resp.status_code, 200)
+        m = resp.context['media_list'][0]
+        self.assertIn('_w400.jpg', m['thumb'])
+        self.assertEqual(m['renditions']['widths'], [400, 800])
+
+
+class GalleryPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        coll = GalleryCollection.objects.create(name='Fête')
+        GalleryMedia.objects.bulk_create(
+            [GalleryMedia(collection=coll, file=f'gallery/fete/img{i}.jpg', media_type='image') for i in range(40)]
+            + [GalleryMedia(collection=coll, file=f'gallery/fete/vid{i}.mp4', media_type='video') for i in range(3)]
+        )
+
+    def test_page_fetched_in_constant_queries(self):
+        client = Client()
+        # exists() + COUNT + page, quel que soit le nombre total de médias
+        with CaptureQueriesContext(connection) as ctx:
+            resp = client.get(reverse('website:gallery'), {'type': 'images', 'page': 2})
+        self.assertEqual(len([q for q in ctx.captured_queries if 'website_gallery' in q['sql']]), 3)
+        self.assertEqual(resp.context['total_count'], 40)
+        self.assertEqual(len(resp.context['media_list']), 8)
+        self.assertTrue(all(m['media_type'] == 'image' for m in resp.context['media_list']))
+
+    def test_video_filter(self):
+        resp = Client().get(reverse('website:gallery'), {'type': 'videos'})
+        self.assertEqual(resp.context['active_type'], 'videos')
+        self.assertEqual([m['media_type'] for m in resp.context['media_list']], ['video'] * 3)
+
+
+class PostsListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        for i in range(14):
+            NewsItem.objects.create(title=f'Article {i}', type='post', status='published')
+        self.upcoming = NewsItem.objects.create(title='Kermesse', type='event', status='published',
+                                                event_start=now + timedelta(days=3))
+        self.ongoing = NewsItem.objects.create(title='Camp', type='event', status='published',
+                                               event_start=now - timedelta(days=1), event_end=now + timedelta(days=1))
+        self.past = NewsItem.objects.create(title='Atelier', type='event', status='published',
+                                            date_event=now - timedelta(days=30), event_end=now - timedelta(days=29))
+        NewsMedia.objects.bulk_create([
+            NewsMedia(news_item=item, file=f'news/media/{item.slug}-{n}.jpg', media_type='image', order=n)
+            for item in NewsItem.objects.all() for n in range(2)
+        ])
+
+    def test_listing_queries_do_not_grow_with_archive(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = Client().get(reverse('website:posts_list'))
+        # COUNT + page annotée + médias de la page + menu des catégories
+        self.assertEqual(len([q for q in ctx.captured_queries if 'website_news' in q['sql']]), 4)
+        self.assertEqual(resp.context['paginator'].count, 17)
+        items = resp.context['items']
+        self.assertEqual(len(items), 12)
+        self.assertEqual(items[0]['title'], 'Kermesse')
+        self.assertEqual(len(items[0]['slides']), 2)
+        self.assertEqual(items[0]['media_url'], '/media/news/media/kermesse-0.jpg')
+
+    def test_event_status_and_upcoming_order(self):
+        resp = Client().get(reverse('website:posts_list'), {'t': 'event'})
+        statuses = {it['title']: it['status'] for it in resp.context['items']}
+        self.assertEqual(statuses, {'Kermesse': 'À venir', 'Camp': 'En cours', 'Atelier': 'Terminé'})
+        resp = Client().get(reverse('website:posts_list'), {'f': 'upcoming'})
+        self.assertEqual([it['title'] for it in resp.context['items']], ['Kermesse'])
+
+    def test_second_page_keeps_filters(self):
+        resp = Client().get(reverse('website:posts_list'), {'t': 'post', 'page': 2})
+        self.assertEqual(len(resp.context['items']), 2)
+        self.assertContains(resp, '?t=post&amp;page=1')
+
+
+class CategoryAliasTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Éducation & Tech')
+        NewsItem.objects.create(title='Atelier code', type='post', status='published', category=self.category)
+
+    def test_legacy_links_redirect_permanently(self):
+        url = reverse('website:posts_list')
+        for legacy in ('Éducation & Tech', 'éducation & tech', 'EDUCATION-TECH'):
+            with CaptureQueriesContext(connection) as ctx:
+                resp = Client().get(url, {'cat': legacy, 't': 'post'})
+            self.assertEqual(resp.status_code, 301)
+            self.assertEqual(resp['Location'], url + '?cat=education-tech&t=post')
+            self.assertFalse([q for q in ctx.captured_queries if q['sql'].startswith(('UPDATE', 'INSERT'))
+                              and 'website_category' in q['sql']])
+        self.assertContains(Client().get(url, {'cat': 'education-tech'}), 'Atelier code')
+
+    def test_renamed_category_keeps_old_names(self):
+        self.category.name = 'Numérique'
+        self.category.slug = 'numerique'
+        self.category.save()
+        resp = Client().get(reverse('website:posts_list'), {'cat': 'education-tech'})
+        self.assertRedirects(resp, reverse('website:posts_list') + '?cat=numerique', status_code=301)
+        # Une nouvelle catégorie reprend l'ancien nom: les alias de ce nom lui reviennent
+        other = Category.objects.create(name='Éducation & Tech')
+        self.assertEqual(CategoryAlias.objects.get(alias='éducation & tech').category, other)
+        self.assertEqual(CategoryAlias.objects.get(alias='numerique').category, self.category)
+
+    def test_unknown_category_not_redirected(self):
+        resp = Client().get(reverse('website:posts_list'), {'cat': 'inconnue'})
+        self.assertEqual(resp.status_code, 200)
+
+
+class CategoryMenuTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        sante = Category.objects.create(name='Santé')
+        sport = Category.objects.create(name='Sport')
+        Category.objects.create(name='Vide')
+        NewsItem.objects.create(title='Dépistage', type='event', status='published', category=sante)
+        NewsItem.objects.create(title='Conseils', type='post', status='published', category=sante)
+        NewsItem.objects.create(title='Tournoi', type='event', status='published', category=sport)
+        NewsItem.objects.create(title='Brouillon', type='post', status='draft', category=sport)
+        Category.objects.bulk_create([Category(name='Sans slug')])
+
+    def menu_queries(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = Client().get(reverse('website:posts_list'), params)
+        return resp, [q for q in ctx.captured_queries if 'website_category' in q['sql']]
+
+    def test_counts_in_one_query_shared_by_variants(self):
+        resp, queries = self.menu_queries()
+        self.assertEqual(len(queries), 1)
+        self.assertFalse([q for q in queries if not q['sql'].startswith('SELECT')])
+        self.assertEqual(resp.context['categories'], [
+            {'name': 'Santé', 'slug': 'sante', 'count': 2},
+            {'name': 'Sport', 'slug': 'sport', 'count': 1},
+        ])
+        resp, queries = self.menu_queries(t='post')
+        self.assertEqual(queries, [])
+        self.assertEqual(resp.context['categories'], [{'name': 'Santé', 'slug': 'sante', 'count': 1}])
+
+    def test_refreshed_when_news_change(self):
+        self.menu_queries()
+        NewsItem.objects.create(title='Marathon', type='event', status='published',
+                                category=Category.objects.get(slug='sport'))
+        resp, queries = self.menu_queries()
+        self.assertTrue(queries)
+        self.assertIn({'name': 'Sport', 'slug': 'sport', 'count': 2}, resp.context['categories'])
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.title_hit = NewsItem.objects.create(title='Journée santé', type='post', status='published',
+                                                 content='Dépistage gratuit pour les enfants.')
+        self.body_hit = NewsItem.objects.create(title='Atelier', type='post', status='published',
+                                                content='Un atelier <b>couture</b> suivi d\'une <a href="/causerie">causerie</a> sur la santé.')
+        NewsItem.objects.create(title='Brouillon santé', type='post', status='draft')
+
+    def test_ranked_accent_insensitive_with_snippets(self):
+        resp = Client().get(reverse('website:search'), {'q': 'sante'})
+        results = resp.context['results']
+        self.assertEqual([r['title'] for r in results], ['Journée santé', 'Atelier'])
+        snippet = results[1]['snippet']
+        self.assertIn('<mark>santé</mark>', snippet)
+        self.assertIn('couture', snippet)
+        self.assertNotIn('&lt;', snippet)
+        self.assertNotIn('b&gt;', snippet)
+
+    def test_markup_not_indexed(self):
+        for q in ('href', 'b'):
+            resp = Client().get(reverse('website:search'), {'q': q})
+            self.assertEqual(resp.context['results'], [], q)
+
+    def test_index_follows_save_and_delete(self):
+        self.body_hit.content = 'Plus rien à voir.'
+        self.body_hit.save()
+        self.title_hit.delete()
+        resp = Client().get(reverse('website:search'), {'q': 'santé'})
+        self.assertEqual(resp.context['results'], [])
+        resp = Client().get(reverse('website:search'), {'q': 'voir'})
+        self.assertEqual([r['title'] for r in resp.context['results']], ['Atelier'])
+
+    def test_fallback_without_fts(self):
+        with mock.patch('website.views.fts_available', return_value=False):
+            resp = Client().get(reverse('website:search'), {'q': 'santé'})
+        self.assertEqual([r['title'] for r in resp.context['results']], ['Atelier', 'Journée santé'])
+
+    def test_paginated(self):
+        for i in range(12):
+            NewsItem.objects.create(title=f'Collecte {i}', type='post', status='published')
+        resp = Client().get(reverse('website:search'), {'q': 'collecte', 'page': 2})
+        self.assertEqual(resp.context['paginator'].count, 12)
+        self.assertEqual(len(resp.context['results']), 2)
+
+
+class SearchSuggestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.cat = Category.objects.create(name='Santé')
+        NewsItem.objects.create(title='Journée santé', type='event', status='published', location='Salle des fêtes')
+        NewsItem.objects.create(title='Salon du livre', type='post', status='draft')
+
+    def get(self, q):
+        return Client().get(reverse('website:search_suggest'), {'q': q}).json()['results']
+
+    def test_prefix_on_any_word_ignoring_accents(self):
+        self.assertEqual([(r['kind'], r['label']) for r in self.get('SANTE')],
+                         [('title', 'Journée santé'), ('category', 'Santé')])
+        self.assertEqual([r['label'] for r in self.get('sal')], ['Salle des fêtes'])
+        self.assertEqual(self.get('s'), [])
+
+    def test_cached_until_index_changes(self):
+        self.get('jour')
+        with CaptureQueriesContext(connection) as ctx:
+            self.get('jour')
+        self.assertFalse([q for q in ctx.captured_queries if 'suggestionterm' in q['sql']])
+        NewsItem.objects.create(title='Journal de bord', type='post', status='published')
+        self.assertEqual([r['label'] for r in self.get('jour')], ['Journal de bord', 'Journée santé'])
+
+
+class ViewCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.item = NewsItem.objects.create(title='Kermesse', type='post', status='published')
+
+    def news_queries(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = Client().get(reverse('website:posts_list'), params)
+        return resp, [q for q in ctx.captured_queries if 'website_news' in q['sql']]
+
+    def test_second_hit_served_from_cache(self):
+        _, first = self.news_queries()
+        resp, second = self.news_queries()
+        self.assertTrue(first)
+        self.assertEqual(second, [])
+        self.assertContains(resp, 'Kermesse')
+        stats = {s['view']: s for s in viewcache.stats()}
+        self.assertEqual((stats['posts_list']['hits'], stats['posts_list']['misses']), (1, 1))
+
+    def test_variants_cached_separately(self):
+        self.news_queries()
+        _, queries = self.news_queries(t='event')
+        self.assertTrue(queries)
+
+    def test_invalidated_by_signals(self):
+        self.news_queries()
+        self.item.title = 'Kermesse annuelle'
+        self.item.save()
+        resp, queries = self.news_queries()
+        self.assertTrue(queries)
+        self.assertContains(resp, 'Kermesse annuelle')
+        # Autre groupe de contenus: la liste des actualités reste en cache
+        Center.objects.create(name='Centre', city='Lomé')
+        self.assertEqual(self.news_queries()[1], [])
+        self.item.delete()
+        self.assertNotContains(self.news_queries()[0], 'Kermesse annuelle')
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.item = NewsItem.objects.create(title='Kermesse', type='post', status='published')
+
+    def test_not_modified_without_running_the_view(self):
+        client = Client()
+        first = client.get(reverse('website:home'))
+        self.assertTrue(first.has_header('ETag'))
+        self.assertTrue(first.has_header('Last-Modified'))
+        with CaptureQueriesContext(connection) as ctx:
+            resp = client.get(reverse('website:home'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.content, b'')
+        self.assertFalse([q for q in ctx.captured_queries if 'website_news' in q['sql']])
+
+        self.item.title = 'Kermesse 2026'
+        self.item.save()
+        resp = client.get(reverse('website:home'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp['ETag'], first['ETag'])
+
+    def test_variants_and_staff_get_no_shared_validator(self):
+        client = Client()
+        etag = client.get(reverse('website:posts_list'))['ETag']
+        self.assertNotEqual(client.get(reverse('website:posts_list'), {'t': 'event'})['ETag'], etag)
+        client.force_login(User.objects.create_user('staff', password='x', is_staff=True))
+        self.assertFalse(client.get(reverse('website:posts_list')).has_header('ETag'))
+
+
+class LoginAttemptTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'secret-pass')
+
+    def test_public_pages_stay_sessionless(self):
+        from django.contrib.sessions.models import Session
+        resp = Client().get(reverse('website:home'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, resp.cookies)
+        self.assertFalse(Session.objects.exists())
+
+    def test_lock_after_failures_by_ip_and_username(self):
+        client = Client()
+        login_url = reverse('admin:login')
+        resp = client.post(login_url, {'username': 'admin', 'password': 'faux'})
+        self.assertEqual(resp.wsgi_request.login_fail_count, 1)
+        client.post(login_url, {'username': 'admin', 'password': 'faux'})
+        client.post(login_url, {'username': 'admin', 'password': 'faux'})
+        resp = client.get(login_url)
+        self.assertTrue(resp.wsgi_request.login_locked)
+        self.assertContains(resp, 'temporairement verrouillé')
+        # Verrouillé: même le bon mot de passe est refusé, depuis une autre IP aussi
+        other = Client(REMOTE_ADDR='10.0.0.9')
+        resp = other.post(login_url, {'username': 'Admin', 'password': 'secret-pass'})
+        self.assertEqual(resp.status_code, 302)
+        self.assertNotIn('_auth_user_id', other.session)
+
+    def test_success_resets_counters(self):
+        client = Client()
+        login_url = reverse('admin:login')
+        client.post(login_url, {'username': 'admin', 'password': 'faux'})
+        client.post(login_url, {'username': 'admin', 'password': 'secret-pass'})
+        self.assertEqual(Client().get(login_url).wsgi_request.login_fail_count, 0)
+
+
+class DashboardMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(User.objects.create_user('staff', password='x', is_staff=True))
+        now = timezone.now()
+        NewsItem.objects.create(title='Brouillon', type='post', status='draft')
+        NewsItem.objects.create(title='Forum', type='event', status='published', event_start=now + timedelta(days=3))
+        NewsItem.objects.create(title='Passé', type='event', status='published', event_start=now - timedelta(days=3))
+        ContactMessage.objects.create(name='A', email='a@example.com', message='Bonjour')
+
+    def content_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse('website:admin_dashboard'))
+        tables = ('website_newsitem', 'website_contactmessage', 'website_center')
+        return resp, [q for q in ctx.captured_queries if any(t in q['sql'] for t in tables)]
+
+    def test_one_query_per_model_then_cached(self):
+        resp, queries = self.content_queries()
+        # Agrégats NewsItem, agrégats ContactMessage, centres, derniers contenus
+        self.assertEqual(len(queries), 4)
+        self.assertEqual((resp.context['total_news'], resp.context['published_news']), (3, 2))
+        self.assertEqual((resp.context['future_events'], resp.context['pending_messages']), (1, 1))
+        this_week = resp.context['weekly'][-1]
+        self.assertEqual((this_week['news'], this_week['messages']), (3, 1))
+        self.assertEqual(len(resp.context['weekly']), 12)
+        self.assertEqual(self.content_queries()[1], [])
+
+    def test_invalidated_by_signals(self):
+        self.content_queries()
+        ContactMessage.objects.create(name='B', email='b@example.com', message='Salut')
+        resp, queries = self.content_queries()
+        self.assertTrue(queries)
+        self.assertEqual(resp.context['pending_messages'], 2)
+
+
+class ImpactMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        impact_metrics.invalidate()
+        self.addCleanup(impact_metrics.invalidate)
+
+    def metrics_queries(self, name):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = Client().get(reverse(name))
+        return resp, [q for q in ctx.captured_queries if 'website_impactmetrics' in q['sql']]
+
+    def test_singleton_read_once_and_refreshed_on_save(self):
+        metrics = ImpactMetrics.objects.create(jeunes_formes='250+')
+        resp, queries = self.metrics_queries('website:donate')
+        self.assertEqual(len(queries), 1)
+        self.assertContains(resp, '250+')
+        cache.clear()  # pages en cache: seule la copie en mémoire du processus reste
+        resp, queries = self.metrics_queries('website:about')
+        self.assertEqual(queries, [])
+        self.assertContains(resp, '250+')
+        metrics.jeunes_formes = '300+'
+        metrics.save()
+        self.assertContains(self.metrics_queries('website:donate')[0], '300+')
+
+    def test_defaults_without_row(self):
+        resp, queries = self.metrics_queries('website:donate')
+        self.assertEqual(len(queries), 1)
+        self.assertContains(resp, '120+')
+        self.assertEqual(self.metrics_queries('website:home')[1], [])
+
+    def test_other_pages_skip_metrics_version(self):
+        with CaptureQueriesContext(connection) as ctx:
+            Client().get(reverse('website:contact'))
+        self.assertFalse([q for q in ctx.captured_queries if "'metrics'" in q['sql']])
+
+    def test_change_from_another_process_seen_through_version(self):
+        ImpactMetrics.objects.create(jeunes_formes='250+')
+        self.assertEqual(impact_metrics.current().jeunes_formes, '250+')
+        # Modification faite ailleurs (autre worker, shell): pas de signal ni d'invalidate()
+        # dans ce processus, seule la version en base change
+        ImpactMetrics.objects.update(jeunes_formes='300+')
+        self.assertEqual(impact_metrics.current().jeunes_formes, '250+')
+        viewcache.bump('metrics')
+        self.assertEqual(impact_metrics.current().jeunes_formes, '300+')
+
+
+class AboutPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.static_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_dir, ignore_errors=True)
+        os.makedirs(os.path.join(self.static_dir, 'img', 'building'))
+        override = override_settings(STATICFILES_DIRS=[self.static_dir])
+        override.enable()
+        self.addCleanup(override.disable)
+        self.addCleanup(building_gallery.refresh, force=True)
+        building_gallery.refresh(force=True)
+
+    def add_file(self, name):
+        with open(os.path.join(self.static_dir, 'img', 'building', name), 'wb') as f:
+            f.write(b'x')
+
+    def test_manifest_scanned_only_when_folder_changes(self):
+        self.add_file('rendu1.jpg')
+        with mock.patch.object(building_gallery, 'scan', wraps=building_gallery.scan) as scan:
+            building_gallery.refresh()
+            building_gallery.refresh()
+            self.assertEqual(scan.call_count, 1)
+            items, _ = building_gallery.manifest()
+            self.assertEqual(scan.call_count, 1)
+        self.assertIn({'type': 'image', 'url': 'img/building/rendu1.jpg'}, items)
+
+    def test_about_lists_limited_upcoming_events(self):
+        now = timezone.now()
+        NewsItem.objects.create(title='Passé', type='event', status='published',
+                                event_start=now - timedelta(days=3), event_end=now - timedelta(days=2))
+        for i in range(8):
+            NewsItem.objects.create(title=f'Futur {i}', type='event', status='published', event_start=now + timedelta(days=i + 1))
+        with mock.patch.object(building_gallery, 'scan', wraps=building_gallery.scan) as scan:
+            resp = Client().get(reverse('website:about'))
+        scan.assert_not_called()
+        self.assertEqual([e.title for e in resp.context['events']], [f'Futur {i}' for i in range(6)])
+
+
+class GalleryImportTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        src = os.path.join(self.media_root, 'gallery_sources', 'fete')
+        os.makedirs(src)
+        for i in range(3):
+            with open(os.path.join(src, f'IMG_{i}.JPG'), 'wb') as f:
+                f.write(make_jpeg(900, 600))
+        with open(os.path.join(src, 'casse.jpg'), 'wb') as f:
+            f.write(b'pas une image')
+        with open(os.path.join(src, 'notes.txt'), 'w') as f:
+            f.write('ignoré')
+        self.coll = GalleryCollection.objects.create(name='Fête', source_folder='fete')
+
+    def test_parallel_bulk_import(self):
+        out = StringIO()
+        call_command('import_gallery', self.coll.slug, workers=2, stdout=out)
+        self.assertIn('3 médias ajoutés', out.getvalue())
+        self.assertIn('1 en échec', out.getvalue())
+        medias = list(self.coll.medias.order_by('file'))
+        self.assertEqual([m.file.name for m in medias], [f'gallery/fete/IMG_{i}.JPG' for i in range(3)])
+        self.assertTrue(all(len(m.checksum) == 64 and m.size and m.renditions['widths'] == [400, 800] for m in medias))
+
+        # Second passage: rien n'est réinséré
+        self.assertEqual(self.coll.import_media(workers=1), 0)
+        self.assertEqual(self.coll.medias.count(), 3)
+
+
+class GalleryZipImportTests(TransactionTestCase):
+    # L'import s'exécute après le commit de l'admin (transaction.on_commit)
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.coll = GalleryCollection.objects.create(name='Camp')
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass')
+
+    def make_zip(self):
+        buf = BytesIO()
+        with zipfile.ZipFile(buf, 'w') as zf:
+            zf.writestr('camp/jour1.jpg', make_jpeg(900, 600))
+            zf.writestr('camp/clip.mp4', b'\x00' * 2048)
+            zf.writestr('camp/lisez-moi.txt', 'ignoré')
+            zf.writestr('camp/', '')
+        return buf.getvalue()
+
+    def upload(self):
+        client = Client()
+        client.force_login(self.admin)
+        return client.post(reverse('admin:website_gallerycollection_change', args=[self.coll.pk]), {
+                'name': self.coll.name, 'source_folder': '',
+            'upload_zip': SimpleUploadedFile('camp.zip', self.make_zip(), 'application/zip'),
+            'medias-TOTAL_FORMS': '0', 'medias-INITIAL_FORMS': '0',
+            'imports-TOTAL_FORMS': '0', 'imports-INITIAL_FORMS': '0',
+        })
+
+    def test_streamed_import_tracks_progress_and_skips_duplicates(self):
+        resp = self.upload()
+        self.assertEqual(resp.status_code, 302)
+        record = GalleryImport.objects.get()
+        self.assertEqual(record.error, '')
+        self.assertEqual((record.status, record.total, record.processed), ('done', 3, 3))
+        self.assertEqual((record.created, record.skipped, record.failed), (2, 1, 0))
+        image = self.coll.medias.get(media_type='image')
+        self.assertEqual(image.file.name, 'gallery/camp/jour1.jpg')
+        self.assertEqual(len(image.checksum), 64)
+        # Les variantes sont laissées au worker
+        self.assertEqual(image.renditions, {})
+        jobs.run_pending()
+        image.refresh_from_db()
+        self.assertEqual(image.renditions['widths'], [400, 800])
+
+        # Même archive renvoyée: tout est ignoré (taille + sha256 identiques)
+        self.upload()
+        record = GalleryImport.objects.first()
+        self.assertEqual((record.created, record.skipped), (0, 3))
+        self.assertEqual(self.coll.medias.count(), 2)
+
+
+class GalleryZipExportTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.coll = GalleryCollection.objects.create(name='Export')
+        for name in ('a.jpg', 'été.jpg'):
+            GalleryMedia.objects.create(collection=self.coll, file=SimpleUploadedFile(name, make_jpeg(300, 200)))
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass')
+
+    def test_streamed_archive_has_exact_length(self):
+        client = Client()
+        client.force_login(self.admin)
+        resp = client.post(reverse('admin:website_gallerycollection_changelist'), {
+            'action': 'exporter_zip', '_selected_action': [self.coll.pk],
+        })
+        self.assertTrue(resp.streaming)
+        body = b''.join(resp.streaming_content)
+        self.assertEqual(int(resp['Content-Length']), len(body))
+        with zipfile.ZipFile(BytesIO(body)) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(sorted(zf.namelist()), ['a.jpg', 'été.jpg'])
+            self.assertTrue(all(i.compress_type == zipfile.ZIP_STORED for i in zf.infolist()))
+
+    def test_compressible_entries_have_no_precomputed_length(self):
+        entries = [ZipEntry('notes.txt', 5, lambda: BytesIO(b'hello'))]
+        self.assertIsNone(archive_size(entries))
+        with zipfile.ZipFile(BytesIO(b''.join(iter_zip(entries)))) as zf:
+            self.assertEqual(zf.read('notes.txt'), b'hello')
+
+
+class BackgroundJobTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_cover_processed_by_worker_not_on_save(self):
+        item = NewsItem.objects.create(
+            title='Avec image', status='published',
+            image=SimpleUploadedFile('cover.jpg', make_jpeg(1700, 900), content_type='image/jpeg'),
+        )
+        self.assertEqual(item.rendition_status, 'pending')
+        self.assertEqual(BackgroundJob.objects.filter(kind='newsitem.renditions', status='pending').count(), 1)
+        # Une seconde sauvegarde sans changement d'image n'enfile rien
+        item.title = 'Avec image (modifié)'
+        item.save()
+        self.assertEqual(BackgroundJob.objects.count(), 1)
+
+        self.assertEqual(jobs.run_pending(), 1)
+        item.refresh_from_db()
+        self.assertEqual(item.rendition_status, 'ready')
+        job = BackgroundJob.objects.get()
+        self.assertEqual((job.status, job.progress), ('done', 100))
+        self.assertIn('_w1600.jpg', responsive_srcset(item.image))
+
+    def test_stale_instance_does_not_undo_worker(self):
+        item = NewsItem.objects.create(
+            title='Avec image', status='published',
+            image=SimpleUploadedFile('cover.png', make_jpeg(1700, 900), content_type='image/png'),
+        )
+        original = item.image.name
+        stale = NewsItem.objects.get(pk=item.pk)
+        jobs.run_pending()
+        # Formulaire ouvert avant la fin du worker, enregistré après
+        stale.title = 'Titre corrigé'
+        stale.save()
+        item.refresh_from_db()
+        self.assertEqual((item.title, item.rendition_status), ('Titre corrigé', 'ready'))
+        self.assertNotEqual(item.image.name, original)
+        self.assertTrue(item.image_renditions['widths'])
+        self.assertEqual(BackgroundJob.objects.count(), 1)
+        # L'original remplacé par la version optimisée est supprimé
+        self.assertFalse(item.image.storage.exists(original))
+        self.assertTrue(item.image.storage.exists(item.image.name))
+
+    def test_srcset_built_from_stored_manifest(self):
+        # Fichier absent du disque: seul le manifeste en base fait foi
+        item = NewsItem.objects.create(title='Manifeste', status='published')
+        NewsItem.objects.filter(pk=item.pk).update(
+            image='news/absent.jpg', rendition_status='ready',
+            image_renditions={'width': 2000, 'height': 1000, 'widths': [800, 1200, 1600, 1920]},
+        )
+        item.refresh_from_db()
+        srcset = responsive_srcset(item.image)
+        self.assertTrue(srcset.startswith('/media/news/absent_w800.jpg 800w'))
+        self.assertTrue(srcset.endswith('/media/news/absent.jpg 2000w'))
+        # Manifeste vide (variantes en attente) → original seul
+        NewsItem.objects.filter(pk=item.pk).update(image_renditions={})
+        item.refresh_from_db()
+        self.assertEqual(responsive_srcset(item.image), '/media/news/absent.jpg')
 
-__all__ = [
-    'NewsItemModelTests',
-    'HomeViewTests',
-    'ContactFormTests',
-]
+    def test_failed_job_is_retried_then_marked_failed(self):
+        job = jobs.enqueue('inconnue', max_attempts=2)
+        jobs.run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('pending', 1))
+        BackgroundJob.objects.filter(pk=job.pk).update(run_after=job.created)
+        jobs.run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertIn('LookupError', job.last_error)
@@ -13,6 +13,7 @@ urlpatterns = [
     path('contact/', views.contact, name='contact'),
     path('donner/', views.donate, name='donate'),
     path('recherche/', views.search, name='search'),
+    path('recherche/suggestions/', views.search_suggest, name='search_suggest'),
     # Dashboard custom staff : ne pas préfixer par 'admin/' pour éviter conflit avec admin.site
     path('dashboard/', views_admin.dashboard, name='admin_dashboard'),
 ]
@@ -0,0 +1,184 @@
+"""Cache des pages publiques (accueil, actualités, galerie, à propos, soutenir).
+
+Le contexte calculé par chaque vue (et, côté gabarit, le fragment HTML du contenu) est mis
+en cache par vue et par variante (paramètres GET utiles). La clé contient le numéro de
+version des groupes de contenus dont dépend la vue: les signaux post_save / post_delete
+des modèles concernés incrémentent ce numéro en base (ContentVersion), ce qui invalide
+précisément les entrées concernées, y compris avec un cache local à chaque processus
+(LocMemCache) ou un cache fichier.
+
+Les mêmes versions servent de validateurs HTTP (ETag / Last-Modified, `conditional_page`):
+un client ou un proxy à jour reçoit un 304 sans que la vue ne soit exécutée.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone as dt_timezone
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+# Groupe de contenus de chaque modèle (nom du modèle → groupe)
+MODEL_GROUPS = {
+    'NewsItem': 'news',
+    'NewsMedia': 'news',
+    'Category': 'news',
+    'GalleryCollection': 'gallery',
+    'GalleryMedia': 'gallery',
+    'Center': 'centers',
+    'ImpactMetrics': 'metrics',
+}
+
+# Vue → (groupes dont dépend son rendu, paramètres GET qui en font varier le contenu)
+VIEWS = {
+    'home': (('news',), ()),
+    'posts_list': (('news',), ('t', 'f', 'cat', 'page')),
+    # La galerie retombe sur les médias des publications quand aucune collection n'existe
+    'gallery': (('gallery', 'news'), ('type', 'page')),
+    'about': (('centers', 'news', 'metrics'), ()),
+    'donate': (('metrics',), ()),
+}
+
+STATS_KEY = 'viewcache:stats:{view}:{outcome}'
+
+
+def timeout():
+    return getattr(settings, 'VIEW_CACHE_TIMEOUT', 300)
+
+
+def bump(*groups):
+    """Incrémente la version des groupes (invalide les vues qui en dépendent)."""
+    from .models import ContentVersion
+    now = timezone.now()
+    for group in groups:
+        updated = ContentVersion.objects.filter(name=group).update(version=F('version') + 1, changed=now)
+        if not updated:
+            ContentVersion.objects.get_or_create(name=group, defaults={'version': 1, 'changed': now})
+
+
+def versions(groups, request=None):
+    """{groupe: (version, date de modification)} en une requête; (0, None) si jamais modifié.
+
+    Avec `request`, le résultat est mémorisé pour la durée de la requête (validateurs HTTP
+    puis clé de cache sans seconde lecture).
+    """
+    from .models import ContentVersion
+    memo = getattr(request, '_content_versions', None)
+    if memo is not None and all(g in memo for g in groups):
+        return {g: memo[g] for g in groups}
+    found = {
+        name: (version, changed)
+        for name, version, changed in ContentVersion.objects.filter(name__in=groups).values_list('name', 'version', 'changed')
+    }
+    result = {group: found.get(group, (0, None)) for group in groups}
+    if request is not None:
+        request._content_versions = {**(memo or {}), **result}
+    return result
+
+
+def _variant(view, request):
+    params = VIEWS[view][1]
+    variant = '&'.join(f"{p}={request.GET.get(p, '')}" for p in params)
+    return hashlib.md5(variant.encode('utf-8')).hexdigest()[:12]
+
+
+def _stamp(view, request):
+    groups = VIEWS[view][0]
+    current = versions(groups, request)
+    return '.'.join(str(current[g][0]) for g in groups)
+
+
+def variant_key(view, request):
+    return f"view:{view}:{_stamp(view, request)}:{_variant(view, request)}"
+
+
+def _count(view, outcome):
+    key = STATS_KEY.format(view=view, outcome=outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def cached_context(view, request, builder):
+    """Contexte de `view` pour cette requête: depuis le cache, sinon `builder(request)`.
+
+    Le contexte reçoit `fragment_key` et `view_cache_timeout` pour le tag {% cache %}
+    des gabarits. Il doit être sérialisable (pas de QuerySet ni de Page: voir `freeze_page`).
+    """
+    key = variant_key(view, request)
+    context = cache.get(key)
+    if context is None:
+        _count(view, 'miss')
+        context = builder(request)
+        cache.set(key, context, timeout())
+    else:
+        _count(view, 'hit')
+    return {**context, 'fragment_key': key, 'view_cache_timeout': timeout()}
+
+
+def freeze_page(page):
+    """Copie sérialisable d'une Page (et de son Paginator) pour les gabarits de pagination."""
+    paginator = SimpleNamespace(count=page.paginator.count, num_pages=page.paginator.num_pages)
+    frozen = SimpleNamespace(
+        number=page.number,
+        has_previous=page.has_previous(),
+        has_next=page.has_next(),
+        previous_page_number=page.number - 1,
+        next_page_number=page.number + 1,
+        paginator=paginator,
+    )
+    return frozen, paginator
+
+
+def stats():
+    """Compteurs succès/échecs par vue (cache courant; par processus avec LocMemCache)."""
+    keys = {(view, outcome): STATS_KEY.format(view=view, outcome=outcome) for view in VIEWS for outcome in ('hit', 'miss')}
+    values = cache.get_many(list(keys.values()))
+    return [
+        {'view': view, 'hits': values.get(keys[(view, 'hit')], 0), 'misses': values.get(keys[(view, 'miss')], 0)}
+        for view in VIEWS
+    ]
+
+
+def _time_bucket():
+    # Les statuts d'événements dépendent de l'heure: les validateurs expirent comme le cache
+    return int(time.time() // timeout())
+
+
+def _personalized(request):
+    """Pages dont le HTML dépend du visiteur (messages flash, lien admin): pas de validateurs."""
+    if request.COOKIES.get(CookieStorage.cookie_name):
+        return True
+    user = getattr(request, 'user', None)
+    return bool(user is not None and user.is_authenticated)
+
+
+def page_etag(view, request):
+    if request.method not in ('GET', 'HEAD') or _personalized(request):
+        return None
+    # Le jeton CSRF inclus dans certains formulaires dépend du cookie csrftoken
+    csrf = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+    raw = f"{view}:{_stamp(view, request)}:{_variant(view, request)}:{_time_bucket()}:{csrf}"
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def page_last_modified(view, request):
+    if request.method not in ('GET', 'HEAD') or _personalized(request):
+        return None
+    changed = [c for _, c in versions(VIEWS[view][0], request).values() if c]
+    bucket_start = datetime.fromtimestamp(_time_bucket() * timeout(), tz=dt_timezone.utc)
+    return max(changed + [bucket_start])
+
+
+def conditional_page(view):
+    """Décorateur: ETag / Last-Modified calculés depuis les versions de contenu, avant la vue;
+    réponse 304 sans requête de contenu ni rendu si le client est à jour."""
+    return condition(
+        etag_func=lambda request, *args, **kwargs: page_etag(view, request),
+        last_modified_func=lambda request, *args, **kwargs: page_last_modified(view, request),
+    )
@@ -1,18 +1,33 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from .models import NewsItem, Center, ContactMessage, Category, ImpactMetrics
+from django.http import HttpResponsePermanentRedirect, JsonResponse
+from django.urls import reverse
+from .models import NewsItem, NewsMedia, Center, ContactMessage, Category, CategoryAlias
 from .forms import ContactForm
-from django.db.models import Q
+from django.db.models import Count, Q, F, Case, When, Value, CharField, DateTimeField, OuterRef, Subquery, prefetch_related_objects
 from django.contrib import messages
-from django.core.mail import send_mail, EmailMultiAlternatives
+from django.utils.html import escape
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
-from django.utils.text import slugify
-from pathlib import Path
-import os
 from django.db.models.functions import Coalesce
+from django.core.files.storage import default_storage
+from .renditions import GALLERY_DISPLAY_WIDTH, GALLERY_THUMB_WIDTH, rendition_url
+from .outbox import queue_email
+from .search import FtsResults, fts_available
+from .slugs import alias_key
+from .suggestions import DEFAULT_LIMIT as DEFAULT_SUGGESTIONS, suggest
+from .building_gallery import manifest as building_manifest
+from . import impact_metrics
+from .viewcache import cached_context, conditional_page, freeze_page, timeout, versions
 
 
+@conditional_page('home')
 def home(request):
+    context = cached_context('home', request, _home_context)
+    return render(request, 'website/home.html', context)
+
+
+def _home_context(request):
     # Listes séparées pour les sections plus bas
     posts = NewsItem.objects.filter(status='published', type='post').prefetch_related('media')[:3]
     events = NewsItem.objects.filter(status='published', type='event').prefetch_related('media').order_by('event_start', 'date_event')[:3]
@@ -25,62 +40,124 @@ def home(request):
         .prefetch_related('media')[:6]
     )
 
-    return render(request, 'website/home.html', {
-        'posts': posts,
-        'events': events,
-        'highlights': highlights,
-    })
+    return {
+        'posts': list(posts),
+        'events': list(events),
+        'highlights': list(highlights),
+    }
 
 
+@conditional_page('about')
 def about(request):
+    context = cached_context('about', request, _about_context)
+    # Manifeste en mémoire (aucun parcours de dossier); sa version complète la clé du fragment
+    building_gallery, building_version = building_manifest()
+    context['building_gallery'] = building_gallery
+    context['fragment_key'] += f':{building_version}'
+    context['impact_metrics'] = impact_metrics.current(request)
+    return render(request, 'website/about.html', context)
+
+
+def _about_context(request):
     centers = Center.objects.all()
-    events = NewsItem.objects.filter(type='event', status='published')
-    metrics = ImpactMetrics.objects.first()
-    # Rassembler automatiquement les médias 3D du projet de siège depuis static/img/building
-    def gather_building_gallery():
-        images_ext = {'.jpg', '.jpeg', '.png', '.webp'}
-        videos_ext = {'.mp4', '.webm', '.ogg', '.mov'}
-        roots = []
-        # Racine static principale de l'app
-        roots.append(Path(settings.BASE_DIR) / 'eej_site' / 'static')
-        # Dossiers static additionnels s'ils existent
-        for p in getattr(settings, 'STATICFILES_DIRS', []):
-            roots.append(Path(p))
-        items = []
-        seen = set()
-        for root in roots:
-            folder = root / 'img' / 'building'
-            if not folder.exists():
-                continue
-            for entry in sorted(folder.iterdir()):
-                if not entry.is_file():
-                    continue
-                ext = entry.suffix.lower()
-                if ext in images_ext or ext in videos_ext:
-                    rel = entry.relative_to(root).as_posix()  # ex: img/building/render1.jpg
-                    if rel in seen:
-                        continue
-                    seen.add(rel)
-                    items.append({
-                        'type': 'image' if ext in images_ext else 'video',
-                        'url': rel,
-                    })
-        return items
-
-    building_gallery = gather_building_gallery()
-    return render(request, 'website/about.html', {
-        'centers': centers,
-        'events': events,
-        'metrics': metrics,
-        'building_gallery': building_gallery,
-    })
+    # Prochains événements (non terminés), bornés
+    now = timezone.now()
+    events = (
+        NewsItem.objects.filter(type='event', status='published')
+        .filter(Q(event_end__gte=now) | Q(event_end__isnull=True, event_start__gte=now) | Q(event_end__isnull=True, event_start__isnull=True, date_event__gte=now))
+        .annotate(start=Coalesce('event_start', 'date_event'))
+        .order_by('start', 'id')
+        .only('title', 'slug', 'event_start', 'event_end', 'date_event')[:ABOUT_EVENTS_LIMIT]
+    )
+    # Chiffres d'impact: ajoutés par la vue (website/impact_metrics.py), hors cache de contexte
+    return {
+        'centers': list(centers),
+        'events': list(events),
+    }
+
+
+POSTS_PER_PAGE = 12
+ABOUT_EVENTS_LIMIT = 6
+SEARCH_PER_PAGE = 10
 
 
+def _annotate_listing(qs, now):
+    """Ajoute sort_date, date_end, listing_status et le premier média (type + fichier)."""
+    first_media = NewsMedia.objects.filter(news_item=OuterRef('pk')).order_by('order', 'id')
+    return qs.annotate(
+        sort_date=Case(
+            When(type='event', then=Coalesce('event_start', 'date_event', 'created')),
+            default=F('created'),
+        ),
+        date_end=Case(When(type='event', then=F('event_end')), default=Value(None), output_field=DateTimeField()),
+        listing_status=Case(
+            When(~Q(type='event') | (Q(event_start__isnull=True) & Q(date_event__isnull=True)), then=Value(None)),
+            When(Q(event_start__gt=now) | (Q(event_start__isnull=True) & Q(date_event__gt=now)), then=Value('À venir')),
+            When(Q(event_end__isnull=True) | Q(event_end__gte=now), then=Value('En cours')),
+            default=Value('Terminé'),
+            output_field=CharField(),
+        ),
+        first_media_type=Subquery(first_media.values('media_type')[:1]),
+        first_media_file=Subquery(first_media.values('file')[:1]),
+    )
+
+
+def _listing_item(obj):
+    """Carte de la liste des actualités à partir d'un NewsItem annoté (sans requête)."""
+    img_url = None
+    if obj.image:
+        try:
+            img_url = obj.image.url
+        except Exception:
+            img_url = None
+    media_type = media_url = None
+    # Fallback vers premier média si pas d'image principale
+    if not img_url and obj.first_media_type in ('image', 'video') and obj.first_media_file:
+        media_type = obj.first_media_type
+        media_url = default_storage.url(obj.first_media_file)
+    # Construire slides (image principale + médias image/vidéo)
+    slides = []
+    if img_url:
+        slides.append({'type': 'image', 'url': img_url, 'file': obj.image})
+    for m in obj.media.all():
+        if m.media_type not in ('image', 'video') or not m.file:
+            continue
+        try:
+            slides.append({'type': m.media_type, 'url': m.file.url, 'file': m.file})
+        except Exception:
+            continue
+    is_event = obj.type == 'event'
+    return {
+        'type': obj.type,
+        'title': obj.title,
+        'slug': obj.slug,
+        'date': obj.sort_date,
+        'date_end': obj.date_end,
+        'status': obj.listing_status,
+        'location': obj.location if is_event and obj.location else '',
+        'image': img_url,
+        'media_type': media_type,
+        'media_url': media_url,
+        'slides': slides,
+    }
+
+
+@conditional_page('posts_list')
 def posts_list(request):
-    qs = NewsItem.objects.filter(status='published').prefetch_related('media')
+    context = cached_context('posts_list', request, _posts_list_context)
+    if 'redirect_to' in context:
+        return HttpResponsePermanentRedirect(context['redirect_to'])
+    return render(request, 'website/posts_list.html', context)
+
+
+def _posts_list_context(request):
+    from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+
+    qs = NewsItem.objects.filter(status='published')
     f = request.GET.get('f')  # 'upcoming' pour événements à venir uniquement
     t = request.GET.get('t')  # 'event' ou 'post' pour filtrer le type
     cat = request.GET.get('cat', '').strip()
+    page = request.GET.get('page', '1')
     now = timezone.now()
 
     if t == 'event':
@@ -101,148 +178,88 @@ def posts_list(request):
     if cat:
         active_category_obj = Category.objects.filter(slug=cat).first()
         if not active_category_obj:
-            # Fallback: support des anciens liens par nom exact (insensible à la casse)
-            active_category_obj = Category.objects.filter(name__iexact=cat).first()
-            # Backfill slug si manquant
-            if active_category_obj and not active_category_obj.slug:
-                try:
-                    active_category_obj.save(update_fields=None)  # déclenche la génération du slug
-                except Exception:
-                    pass
-        if not active_category_obj:
-            # Fallback 2: comparer slugify(name) au paramètre reçu (ex: "Éducation & Tech" -> "education-tech")
-            try:
-                for cobj in Category.objects.all():
-                    if slugify(cobj.name) == cat:
-                        active_category_obj = cobj
-                        if not active_category_obj.slug:
-                            try:
-                                active_category_obj.save(update_fields=None)
-                            except Exception:
-                                pass
-                        break
-            except Exception:
-                pass
+            # Anciens liens (nom, nom slugifié, slug périmé): une lecture d'index, puis 301
+            alias = CategoryAlias.objects.select_related('category').filter(alias=alias_key(cat)).first()
+            if alias and alias.category.slug:
+                params = request.GET.copy()
+                params['cat'] = alias.category.slug
+                return {'redirect_to': reverse('website:posts_list') + '?' + params.urlencode()}
         if active_category_obj:
             qs = qs.filter(category=active_category_obj)
             active_category = active_category_obj.name
             active_category_slug = active_category_obj.slug or ''
-    items = []
-    for obj in qs:
-        if obj.type == 'event':
-            date_val = obj.event_start or obj.date_event or obj.created
-            date_end = obj.event_end
-            # Statut de l'événement
-            status = None
-            start = obj.event_start or obj.date_event
-            end = obj.event_end
-            if start and end:
-                if now < start:
-                    status = 'À venir'
-                elif start <= now <= end:
-                    status = 'En cours'
-                else:
-                    status = 'Terminé'
-            elif start:
-                status = 'À venir' if now < start else 'En cours'
-        else:
-            date_val = obj.created
-            date_end = None
-            status = None
-        img_url = None
-        media_type = None
-        media_url = None
-        if getattr(obj, 'image', None):
-            try:
-                if obj.image and hasattr(obj.image, 'url'):
-                    img_url = obj.image.url
-            except Exception:
-                img_url = None
-        # Fallback vers premier média si pas d'image principale
-        if not img_url:
-            try:
-                m = obj.media.first()
-            except Exception:
-                m = None
-            if m:
-                try:
-                    url = m.file.url
-                except Exception:
-                    url = None
-                if url:
-                    if m.media_type == 'image':
-                        media_type = 'image'
-                        media_url = url
-                    elif m.media_type == 'video':
-                        media_type = 'video'
-                        media_url = url
-        # Construire slides (image principale + médias image/vidéo)
-        slides = []
-        if img_url:
-            slides.append({'type': 'image', 'url': img_url})
-        try:
-            for m in obj.media.all():
-                try:
-                    mu = m.file.url
-                except Exception:
-                    mu = None
-                if not mu:
-                    continue
-                if m.media_type in ('image', 'video'):
-                    slides.append({'type': m.media_type, 'url': mu})
-        except Exception:
-            pass
-
-        items.append({
-            'type': obj.type,
-            'title': obj.title,
-            'slug': obj.slug,
-            'date': date_val,
-            'date_end': date_end,
-            'status': status,
-            'location': obj.location if obj.type == 'event' and obj.location else '',
-            'image': img_url,
-            'media_type': media_type,
-            'media_url': media_url,
-            'slides': slides,
-        })
-    # Tri: si on filtre "à venir", on met par date croissante; sinon par date décroissante
+    # Date, statut et premier média calculés en SQL; tri et pagination en base
+    qs = _annotate_listing(qs, now)
     if f == 'upcoming':
-        items.sort(key=lambda x: (x['date'] is None, x['date'] or now))
+        qs = qs.order_by('sort_date', 'id')
     else:
-        items.sort(key=lambda x: x['date'], reverse=True)
-    # Charger la liste des catégories "actives": celles qui ont au moins un contenu publié
-    cat_qs = Category.objects.filter(newsitem__status='published')
-    if t in ('event', 'post'):
-        cat_qs = cat_qs.filter(newsitem__type=t)
-    categories = list(cat_qs.distinct().order_by('name'))
-    # S'assurer que chaque catégorie du menu possède un slug utilisable
-    for c in categories:
-        if not getattr(c, 'slug', None) and c.name:
-            try:
-                c.save(update_fields=None)
-            except Exception:
-                pass
-    return render(request, 'website/posts_list.html', {
+        qs = qs.order_by('-sort_date', '-id')
+    paginator = Paginator(qs, POSTS_PER_PAGE)
+    try:
+        page_obj = paginator.page(page)
+    except PageNotAnInteger:
+        page_obj = paginator.page(1)
+    except EmptyPage:
+        page_obj = paginator.page(paginator.num_pages)
+    page_items = list(page_obj.object_list)
+    # Les médias des seuls éléments de la page (une requête) pour les carrousels
+    prefetch_related_objects(page_items, 'media')
+    items = [_listing_item(obj) for obj in page_items]
+    categories = _category_menu(request, t if t in ('event', 'post') else None)
+    params = request.GET.copy()
+    params.pop('page', None)
+    page_obj, paginator = freeze_page(page_obj)
+    return {
         'items': items,
+        'page_obj': page_obj,
+        'paginator': paginator,
+        'page_query': params.urlencode(),
         'active_filter': f or '',
         'active_type': t or '',
         'active_category': active_category,
         'active_category_slug': active_category_slug,
         'categories': categories,
-    })
+    }
+
+
+CATEGORY_MENU_KEY = 'posts:category-menu:{version}'
+
+
+def _category_menu(request, kind=None):
+    """Catégories ayant au moins un contenu publié (du type `kind` s'il est donné), avec leur nombre.
+
+    Une requête d'agrégats (comptes par type) partagée par toutes les variantes de la liste,
+    en cache jusqu'au prochain changement du groupe 'news' (NewsItem, Category).
+    """
+    version = versions(('news',), request)['news'][0]
+    key = CATEGORY_MENU_KEY.format(version=version)
+    menu = cache.get(key)
+    if menu is None:
+        published = Q(newsitem__status='published')
+        menu = list(
+            Category.objects.exclude(slug__isnull=True).exclude(slug='')
+            .annotate(
+                all_count=Count('newsitem', filter=published),
+                post_count=Count('newsitem', filter=published & Q(newsitem__type='post')),
+                event_count=Count('newsitem', filter=published & Q(newsitem__type='event')),
+            )
+            .filter(all_count__gt=0)
+            .order_by('name')
+            .values('name', 'slug', 'all_count', 'post_count', 'event_count')
+        )
+        cache.set(key, menu, timeout())
+    count_key = f'{kind}_count' if kind else 'all_count'
+    return [{'name': c['name'], 'slug': c['slug'], 'count': c[count_key]} for c in menu if c[count_key]]
 
 
 def post_detail(request, slug):
     item = get_object_or_404(NewsItem.objects.prefetch_related('media'), slug=slug, status='published')
     item_date = (item.event_start or item.date_event) if (item.type == 'event') else item.created
-    # Calcul temps de lecture (200 wpm approximatif)
-    word_count = 0
-    if item.content:
-        word_count = len(item.content.split())
-    read_time = max(1, round(word_count / 200)) if word_count else 1
     # Contenus liés (même type ou mélange) - exclure courant
-    related_qs = NewsItem.objects.filter(status='published').exclude(id=item.id)[:6]
+    related_qs = (
+        NewsItem.objects.filter(status='published').exclude(id=item.id)
+        .only('title', 'slug', 'type', 'event_start', 'date_event', 'created')[:3]
+    )
     related = []
     for r in related_qs:
         date_val = (r.event_start or r.date_event) if r.type == 'event' else r.created
@@ -253,44 +270,9 @@ def post_detail(request, slug):
             'date': date_val,
         })
     # Pagination prev/next
-    prev_item = NewsItem.objects.filter(status='published', created__gt=item.created).order_by('created').first()
-    next_item = NewsItem.objects.filter(status='published', created__lt=item.created).order_by('-created').first()
-
-    # TOC parsing (simple regex for h2/h3)
-    article_html = ''
-    toc = []
-    if item.content:
-        raw = item.content
-        # Si le contenu ne contient pas de balises h2/h3, article_html = linebreaks fallback
-        import re
-        heading_pattern = re.compile(r'<(h2|h3)>(.*?)</\1>', re.IGNORECASE | re.DOTALL)
-        matches = list(heading_pattern.finditer(raw))
-        if matches:
-            # Inject id dans les balises
-            def slugify_heading(text):
-                s = re.sub(r'<.*?>', '', text)  # remove inner html
-                s = re.sub(r'[^\w\- ]+', '', s).strip().lower().replace(' ', '-')
-                return s[:60]
-            new_html = raw
-            offset = 0
-            for m in matches:
-                tag = m.group(1).lower()
-                inner = m.group(2)
-                hid = slugify_heading(inner)
-                if not hid:
-                    continue
-                toc.append({'id': hid, 'text': re.sub(r'<.*?>', '', inner).strip(), 'level': int(tag[1])})
-                original = m.group(0)
-                replaced = f'<{tag} id="{hid}">{inner}</{tag}>'
-                start = m.start() + offset
-                end = m.end() + offset
-                new_html = new_html[:start] + replaced + new_html[end:]
-                offset += len(replaced) - len(original)
-            article_html = new_html
-        else:
-            # Pas d'en-têtes html, fallback simple
-            from django.utils.html import linebreaks
-            article_html = linebreaks(item.content)
+    prev_item = NewsItem.objects.filter(status='published', created__gt=item.created).only('title', 'slug').order_by('created').first()
+    next_item = NewsItem.objects.filter(status='published', created__lt=item.created).only('title', 'slug').order_by('-created').first()
+
     # Préparer fallback média si pas d'image principale
     media_list = list(getattr(item, 'media').all()) if hasattr(item, 'media') else []
     primary_media = None
@@ -301,7 +283,7 @@ def post_detail(request, slug):
     slides = []
     if item.image:
         try:
-            slides.append({'type': 'image', 'url': item.image.url, 'caption': ''})
+            slides.append({'type': 'image', 'url': item.image.url, 'file': item.image, 'caption': ''})
         except Exception:
             pass
     for m in media_list:
@@ -312,17 +294,18 @@ def post_detail(request, slug):
         if not mu:
             continue
         if m.media_type in ('image', 'video'):
-            slides.append({'type': m.media_type, 'url': mu, 'caption': m.caption or ''})
+            slides.append({'type': m.media_type, 'url': mu, 'file': m.file, 'caption': m.caption or ''})
 
     context = {
         'item': item,
         'item_date': item_date,
-        'read_time': read_time,
+        # HTML, sommaire et temps de lecture précalculés à l'enregistrement (NewsItem.render_article)
+        'read_time': item.read_time,
         'related': related[:3],
         'prev_item': prev_item,
         'next_item': next_item,
-        'article_html': article_html or None,
-        'toc': toc,
+        'article_html': item.article_html or None,
+        'toc': item.toc,
         'media_list': media_list,
         'primary_media': primary_media,
         'slides': slides,
@@ -350,35 +333,24 @@ def contact(request):
                 "Ceci est un envoi automatique, merci de ne pas répondre directement à cet email.\n\n"
                 "Enfants En Joie"
             )
-            preview = msg_obj.message[:400]
+            preview = escape(msg_obj.message[:400])
             preview_html = preview.replace('\n', '<br>')
             if len(msg_obj.message) > 400:
                 preview_html += '...'
             html_body = (
-                f"<p>Bonjour <strong>{name}</strong>,</p>"
+                f"<p>Bonjour <strong>{escape(name)}</strong>,</p>"
                 "<p>Nous avons bien reçu votre message et vous remercions de votre intérêt. "
                 "Notre équipe le traitera dans les meilleurs délais (24–48h).</p>"
                 "<p><strong>Récapitulatif :</strong><br>"
                 f"Type : {msg_obj.get_request_type_display()}<br>"
-                f"Objet : {msg_obj.subject or '(aucun)'}<br>"
+                f"Objet : {escape(msg_obj.subject) or '(aucun)'}<br>"
                 f"Message : {preview_html}</p>"
                 "<p style='font-size:12px;color:#555'>Ceci est un envoi automatique, merci de ne pas répondre directement à cet email.</p>"
                 "<p style='font-size:13px'>Enfants En Joie</p>"
             )
-            try:
-                if user_email:
-                    email = EmailMultiAlternatives(
-                        subject_ack,
-                        plain_body,
-                        getattr(settings, 'DEFAULT_FROM_EMAIL', 'no-reply@example.com'),
-                        [user_email],
-                        cc=['tfeinsti@gmail.com'],
-                    )
-                    email.attach_alternative(html_body, 'text/html')
-                    email.send(fail_silently=True)
-            except Exception:
-                # Ne pas bloquer l'utilisateur si l'email échoue
-                pass
+            if user_email:
+                # Envoi différé: le worker `send_outbox` se charge de la connexion SMTP
+                queue_email(subject_ack, plain_body, [user_email], cc=['tfeinsti@gmail.com'], html_body=html_body)
             messages.success(request, "Message envoyé avec succès. Merci pour votre contact ! Un accusé vous a été envoyé.")
             return redirect('website:contact')
         else:
@@ -388,59 +360,88 @@ def contact(request):
     return render(request, 'website/contact.html', {'form': form})
 
 
+@conditional_page('donate')
 def donate(request):
-    metrics = ImpactMetrics.objects.first()
-    return render(request, 'website/donate.html', {'metrics': metrics})
+    context = cached_context('donate', request, lambda request: {})
+    context['impact_metrics'] = impact_metrics.current(request)
+    return render(request, 'website/donate.html', context)
 
 
 def search(request):
+    """Recherche classée (FTS5 + bm25) avec extraits surlignés et pagination."""
+    from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+
     query = request.GET.get('q', '').strip()
+    page = request.GET.get('page', '1')
     results = []
+    page_obj = paginator = None
     if query:
-        qs = NewsItem.objects.filter(status='published').filter(
-            Q(title__icontains=query) | Q(content__icontains=query) | Q(location__icontains=query)
-        )
-        for obj in qs:
-            date_val = (obj.event_start or obj.date_event) if obj.type == 'event' else obj.created
-            image_url = ''
-            media_type = None
-            media_url = None
-            if obj.image:
-                try:
-                    # Utiliser .url si File/ImageField; fallback direct sinon
-                    image_url = obj.image.url
-                except Exception:
-                    image_url = str(obj.image)
-            if not image_url:
-                try:
-                    m = obj.media.first()
-                except Exception:
-                    m = None
-                if m:
-                    try:
-                        mu = m.file.url
-                    except Exception:
-                        mu = None
-                    if mu:
-                        if m.media_type == 'image':
-                            media_type = 'image'
-                            media_url = mu
-                        elif m.media_type == 'video':
-                            media_type = 'video'
-                            media_url = mu
-            results.append({
-                'type': obj.type,
-                'title': obj.title,
-                'slug': obj.slug,
-                'date': date_val,
-                'image': image_url,
-                'media_type': media_type,
-                'media_url': media_url,
-            })
-        results.sort(key=lambda x: x['date'], reverse=True)
-    return render(request, 'website/search.html', {'query': query, 'results': results})
+        if fts_available():
+            hits = FtsResults(query)
+        else:
+            # Repli sans FTS5: ancienne recherche LIKE, triée par date
+            hits = NewsItem.objects.filter(status='published').filter(
+                Q(title__icontains=query) | Q(content__icontains=query) | Q(location__icontains=query)
+            ).annotate(
+                sort_date=Case(When(type='event', then=Coalesce('event_start', 'date_event', 'created')), default=F('created'))
+            ).order_by('-sort_date', '-id').values_list('id', Value(''))
+        paginator = Paginator(hits, SEARCH_PER_PAGE)
+        try:
+            page_obj = paginator.page(page)
+        except PageNotAnInteger:
+            page_obj = paginator.page(1)
+        except EmptyPage:
+            page_obj = paginator.page(paginator.num_pages)
+        snippets = dict(page_obj.object_list)
+        # Hydratation de la seule page, premier média inclus (pas de requête par résultat)
+        objs = _annotate_listing(NewsItem.objects.filter(pk__in=snippets), timezone.now()).in_bulk()
+        for pk, snippet in snippets.items():
+            item = _search_item(objs[pk]) if pk in objs else None
+            if item:
+                item['snippet'] = snippet
+                results.append(item)
+    return render(request, 'website/search.html', {
+        'query': query,
+        'results': results,
+        'page_obj': page_obj,
+        'paginator': paginator,
+    })
 
 
+def search_suggest(request):
+    """Suggestions JSON pour la saisie semi-automatique: ?q=<préfixe>&limit=N."""
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_SUGGESTIONS))
+    except ValueError:
+        limit = DEFAULT_SUGGESTIONS
+    response = JsonResponse({'results': suggest(request.GET.get('q', ''), limit)})
+    response['Cache-Control'] = 'public, max-age=60'
+    return response
+
+
+def _search_item(obj):
+    image_url = ''
+    if obj.image:
+        try:
+            image_url = obj.image.url
+        except Exception:
+            image_url = str(obj.image)
+    media_type = media_url = None
+    if not image_url and obj.first_media_type in ('image', 'video') and obj.first_media_file:
+        media_type = obj.first_media_type
+        media_url = default_storage.url(obj.first_media_file)
+    return {
+        'type': obj.type,
+        'title': obj.title,
+        'slug': obj.slug,
+        'date': obj.sort_date,
+        'image': image_url,
+        'media_type': media_type,
+        'media_url': media_url,
+    }
+
+
+@conditional_page('gallery')
 def gallery(request):
     """Galerie des images et vidéos alimentée par les GalleryCollection.
     Fallback: si aucune collection, on affiche les médias des NewsItem comme avant.
@@ -448,34 +449,41 @@ def gallery(request):
       - type=images|videos
       - page=N
     """
+    context = cached_context('gallery', request, _gallery_context)
+    return render(request, 'website/gallery.html', context)
+
+
+def _gallery_context(request):
     from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-    from .models import GalleryCollection
+    from .models import GalleryCollection, GalleryMedia
 
     kind = (request.GET.get('type') or '').lower().strip()
     page = request.GET.get('page', '1')
 
-    collections = GalleryCollection.objects.prefetch_related('medias').order_by('-created')
-    flat = []
-    if collections.exists():
-        for coll in collections:
-            for gm in coll.medias.all():
-                try:
-                    url = gm.file.url
-                except Exception:
-                    url = None
-                if not url:
-                    continue
-                flat.append({
-                    'title': coll.name,
-                    'slug': None,  # Pas de page détail pour l'instant
-                    'post_type': 'gallery',
-                    'media_type': gm.media_type,
-                    'url': url,
-                    'caption': '',
-                    'date': coll.created,
-                })
+    if kind in ('image', 'images'):
+        active_type, media_type = 'images', 'image'
+    elif kind in ('video', 'videos'):
+        active_type, media_type = 'videos', 'video'
+    else:
+        active_type, media_type = 'all', None
+
+    if GalleryCollection.objects.exists():
+        # Filtre, tri et pagination en SQL: seule la page demandée est chargée (lignes values())
+        qs = GalleryMedia.objects.order_by('-created', '-id')
+        if media_type:
+            qs = qs.filter(media_type=media_type)
+        rows = qs.values('file', 'media_type', 'renditions', 'created', 'collection__name')
+        paginator = Paginator(rows, 32)
+        try:
+            page_obj = paginator.page(page)
+        except PageNotAnInteger:
+            page_obj = paginator.page(1)
+        except EmptyPage:
+            page_obj = paginator.page(paginator.num_pages)
+        media_list = [_gallery_row(row) for row in page_obj.object_list]
     else:
         # Fallback sur NewsItem (ancienne logique réduite)
+        flat = []
         qs = NewsItem.objects.filter(status='published').prefetch_related('media')
         for obj in qs:
             date_val = (obj.event_start or obj.date_event) if obj.type == 'event' else obj.created
@@ -513,31 +521,47 @@ def gallery(request):
             except Exception:
                 pass
 
-    # Filtrage type
-    if kind in ('image', 'images'):
-        flat = [x for x in flat if x['media_type'] == 'image']
-        active_type = 'images'
-    elif kind in ('video', 'videos'):
-        flat = [x for x in flat if x['media_type'] == 'video']
-        active_type = 'videos'
-    else:
-        active_type = 'all'
+        # Filtrage type
+        if media_type:
+            flat = [x for x in flat if x['media_type'] == media_type]
 
-    flat.sort(key=lambda x: (x.get('date') is None, x.get('date')), reverse=True)
+        flat.sort(key=lambda x: (x.get('date') is None, x.get('date')), reverse=True)
 
-    paginator = Paginator(flat, 32)
-    try:
-        page_obj = paginator.page(page)
-    except PageNotAnInteger:
-        page_obj = paginator.page(1)
-    except EmptyPage:
-        page_obj = paginator.page(paginator.num_pages)
+        paginator = Paginator(flat, 32)
+        try:
+            page_obj = paginator.page(page)
+        except PageNotAnInteger:
+            page_obj = paginator.page(1)
+        except EmptyPage:
+            page_obj = paginator.page(paginator.num_pages)
+        media_list = list(page_obj.object_list)
 
-    context = {
-        'media_list': list(page_obj.object_list),
+    page_obj, paginator = freeze_page(page_obj)
+    return {
+        'media_list': media_list,
         'page_obj': page_obj,
         'paginator': paginator,
         'active_type': active_type,
         'total_count': paginator.count,
     }
-    return render(request, 'website/gallery.html', context)
+
+
+def _gallery_row(row):
+    """Ligne values() de GalleryMedia → élément de grille (vignette + rendu lightbox)."""
+    name = row['file']
+    url = default_storage.url(name)
+    manifest = row['renditions'] or {}
+    is_image = row['media_type'] == 'image'
+    return {
+        'title': row['collection__name'],
+        'slug': None,  # Pas de page détail pour l'instant
+        'post_type': 'gallery',
+        'media_type': row['media_type'],
+        'url': url,
+        'renditions': manifest,
+        # Vignette pour la grille, rendu "écran" pour la lightbox (pas l'original)
+        'thumb': rendition_url(name, manifest, GALLERY_THUMB_WIDTH) if is_image else url,
+        'full': rendition_url(name, manifest, GALLERY_DISPLAY_WIDTH) if is_image else url,
+        'caption': '',
+        'date': row['created'],
+    }
@@ -0,0 +1,94 @@
+"""Écriture d'archives ZIP en flux (StreamingHttpResponse), sans tout charger en mémoire.
+
+Les médias déjà compressés (JPEG, PNG, MP4...) sont stockés tels quels (ZIP_STORED):
+pas de recompression inutile, et la taille finale de l'archive devient calculable
+à l'avance (en-tête Content-Length).
+"""
+import os
+import struct
+import zipfile
+
+CHUNK_SIZE = 64 * 1024
+
+# Formats déjà compressés: les dégonfler n'apporte rien
+STORED_EXTS = {
+    '.jpg', '.jpeg', '.png', '.webp', '.gif', '.avif',
+    '.mp4', '.webm', '.ogg', '.ogv', '.mov', '.zip',
+}
+
+# Tailles fixes des structures ZIP (sans ZIP64, sans champ extra ni commentaire)
+_LOCAL_HEADER = struct.calcsize(zipfile.structFileHeader)
+_DATA_DESCRIPTOR = struct.calcsize('<LLLL')
+_CENTRAL_HEADER = struct.calcsize(zipfile.structCentralDir)
+_END_RECORD = struct.calcsize(zipfile.structEndArchive)
+
+
+class ZipEntry:
+    """Fichier à ajouter à l'archive: nom dans l'archive, taille, date et ouverture différée."""
+
+    def __init__(self, arcname, size, opener, date_time=(1980, 1, 1, 0, 0, 0)):
+        self.arcname = arcname
+        self.size = size
+        self.opener = opener
+        self.date_time = date_time
+        self.stored = os.path.splitext(arcname)[1].lower() in STORED_EXTS
+
+    def encoded_name(self):
+        try:
+            return self.arcname.encode('ascii')
+        except UnicodeEncodeError:
+            return self.arcname.encode('utf-8')
+
+
+class _ChunkSink:
+    """Flux en écriture seule (non "seekable") dont on vide régulièrement le contenu."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def archive_size(entries):
+    """Taille exacte de l'archive produite par `iter_zip`, ou None si non calculable
+    (entrée compressée, ou archive nécessitant les extensions ZIP64)."""
+    if len(entries) >= zipfile.ZIP_FILECOUNT_LIMIT:
+        return None
+    total = _END_RECORD
+    for entry in entries:
+        if not entry.stored or entry.size * 1.05 > zipfile.ZIP64_LIMIT:
+            return None
+        name_len = len(entry.encoded_name())
+        total += _LOCAL_HEADER + name_len + entry.size + _DATA_DESCRIPTOR + _CENTRAL_HEADER + name_len
+    return total if total <= zipfile.ZIP64_LIMIT else None
+
+
+def iter_zip(entries, chunk_size=CHUNK_SIZE):
+    """Génère l'archive ZIP par morceaux; chaque fichier est lu par blocs de `chunk_size`."""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w') as zf:
+        for entry in entries:
+            zinfo = zipfile.ZipInfo(entry.arcname, date_time=entry.date_time)
+            zinfo.compress_type = zipfile.ZIP_STORED if entry.stored else zipfile.ZIP_DEFLATED
+            zinfo.file_size = entry.size  # active ZIP64 si nécessaire
+            with entry.opener() as src, zf.open(zinfo, 'w') as dest:
+                for chunk in iter(lambda: src.read(chunk_size), b''):
+                    dest.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    # Répertoire central + fin d'archive
+    yield sink.drain()